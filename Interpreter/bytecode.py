@@ -0,0 +1,340 @@
+from Interpreter.runtime import BINARY_OPERATORS
+from Interpreter.scope import resolve
+from Mbase.types import BaseLiteral, Function
+from Parser.token_type import TokenType
+from Mbase.ast import (
+    ArrayLiteral,
+    Assign,
+    BinOp,
+    Break,
+    Call,
+    Continue,
+    If,
+    Interpolation,
+    Loop,
+    Return,
+    Spawn,
+    Use,
+    Text,
+    Var,
+    While,
+)
+
+# Instructions are two ints, opcode and argument, stored flat in Code.ops.
+# Jump arguments are offsets relative to the next instruction.
+LOAD_CONST = 0              # push consts[arg]
+LOAD_FAST = 1               # push slots[arg], or the global of the same name while it is unassigned
+STORE_FAST = 2              # slots[arg] = pop
+LOAD_GLOBAL = 3             # push ctx[names[arg]]
+STORE_GLOBAL = 4            # ctx[names[arg]] = pop
+BINARY = 5                  # right = pop; left = pop; push BINARY_OPS[arg](left, right)
+NOT = 6                     # push not truthy(pop)
+TRUTHY = 7                  # push truthy(pop)
+POP = 8                     # discard the top of the stack
+JUMP = 9                    # ip += arg
+POP_JUMP_IF_FALSE = 10      # if not truthy(pop): ip += arg
+JUMP_IF_FALSE_OR_POP = 11   # if not top: ip += arg, else pop
+JUMP_IF_TRUE_OR_POP = 12    # if top: ip += arg, else pop
+CALL = 13                   # name, argc = consts[arg]; call it with the top argc values
+RETURN_VALUE = 14           # return pop to the caller
+DEFINE_FUNCTION = 15        # register consts[arg] in __functions__
+TO_STR = 16                 # push str(pop)
+BUILD_STRING = 17           # join the top arg strings
+RAISE_SIGNAL = 18           # raise a break/continue that no loop in this code handles
+TAIL_CALL = 19              # like CALL, but a user function replaces the current frame
+BUILD_ARRAY = 20            # replace the top arg values with an array of them
+SPAWN = 21                  # like CALL, but the call runs as a new task; push the task
+USE = 22                    # load the plugin named consts[arg] into __functions__
+
+OPNAMES = [
+    "LOAD_CONST", "LOAD_FAST", "STORE_FAST", "LOAD_GLOBAL", "STORE_GLOBAL", "BINARY", "NOT", "TRUTHY", "POP",
+    "JUMP", "POP_JUMP_IF_FALSE", "JUMP_IF_FALSE_OR_POP", "JUMP_IF_TRUE_OR_POP", "CALL", "RETURN_VALUE",
+    "DEFINE_FUNCTION", "TO_STR", "BUILD_STRING", "RAISE_SIGNAL", "TAIL_CALL", "BUILD_ARRAY",
+    "SPAWN", "USE",
+]
+JUMPS = {JUMP, POP_JUMP_IF_FALSE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP}
+
+BINARY_OPS = list(BINARY_OPERATORS.values())
+BINARY_INDEX = {op: i for i, op in enumerate(BINARY_OPERATORS)}
+
+# CALL, SPAWN, BUILD_STRING and BUILD_ARRAY depend on their argument
+STACK_EFFECT = {
+    LOAD_CONST: 1, LOAD_FAST: 1, STORE_FAST: -1, LOAD_GLOBAL: 1, STORE_GLOBAL: -1,
+    BINARY: -1, NOT: 0, TRUTHY: 0, POP: -1, JUMP: 0, POP_JUMP_IF_FALSE: -1,
+    JUMP_IF_FALSE_OR_POP: -1, JUMP_IF_TRUE_OR_POP: -1, RETURN_VALUE: -1, DEFINE_FUNCTION: 0,
+    TO_STR: 0, RAISE_SIGNAL: 0, USE: 0,
+}
+
+# Exception table entry kinds
+HANDLER_ERROR = 0   # a BinOp: print the error at its position and push None
+HANDLER_LOOP = 1    # a loop body: catches break/continue signals raised from calls
+
+
+class Code:
+    # handlers: (start, end, kind, depth, a, b, label), innermost first.
+    # HANDLER_ERROR: a = resume offset, b = source position; HANDLER_LOOP: a = break, b = continue target
+    # param_slots[i] is the slot that receives argument i
+    __slots__ = ("name", "ops", "consts", "names", "varnames", "slot_index", "param_slots", "handlers")
+
+    def __init__(self, name):
+        self.name = name
+        self.ops = []
+        self.consts = []
+        self.names = []
+        self.varnames = []
+        self.slot_index = {}
+        self.param_slots = ()
+        self.handlers = []
+
+
+class Compiler:
+    # scope is the function's Scope, None for top-level code
+    def __init__(self, name, scope=None):
+        self.code = Code(name)
+        self.scope = scope
+        self.depth = 0
+        self.loops = []
+        self.const_index = {}
+        for name in scope.names if scope is not None else ():
+            self.slot(name)
+
+    # Emitting
+
+    def emit(self, op, arg=0, effect=None):
+        self.code.ops += (op, arg)
+        self.depth += STACK_EFFECT[op] if effect is None else effect
+        return len(self.code.ops) - 2
+
+    def here(self):
+        return len(self.code.ops)
+
+    def patch(self, at, target=None):
+        target = self.here() if target is None else target
+        self.code.ops[at + 1] = target - (at + 2)
+
+    def const(self, value):
+        # Strings, tuples and None are shared; literals and functions are kept by identity
+        key = (type(value), value) if value is None or type(value) in (str, tuple) else (type(value), id(value))
+        index = self.const_index.get(key)
+        if index is None:
+            index = self.const_index[key] = len(self.code.consts)
+            self.code.consts.append(value)
+        return index
+
+    def name(self, name):
+        names = self.code.names
+        if name not in names:
+            names.append(name)
+        return names.index(name)
+
+    def slot(self, name):
+        index = self.code.slot_index.get(name)
+        if index is None:
+            index = self.code.slot_index[name] = len(self.code.varnames)
+            self.code.varnames.append(name)
+        return index
+
+    # Statements leave the stack as they found it
+
+    def statement(self, stmt):
+        if isinstance(stmt, Assign):
+            self.expression(stmt.value)
+            self.store(stmt.name)
+        elif isinstance(stmt, Function):
+            self.emit(DEFINE_FUNCTION, self.const(stmt))
+        elif isinstance(stmt, Use):
+            self.emit(USE, self.const(stmt.name))
+        elif isinstance(stmt, If):
+            self.expression(stmt.condition)
+            to_else = self.emit(POP_JUMP_IF_FALSE)
+            self.block(stmt.then_body)
+            if stmt.else_body:
+                to_end = self.emit(JUMP)
+                self.patch(to_else)
+                self.block(stmt.else_body)
+                self.patch(to_end)
+            else:
+                self.patch(to_else)
+        elif isinstance(stmt, While):
+            top = self.here()
+            self.expression(stmt.condition)
+            to_end = self.emit(POP_JUMP_IF_FALSE)
+            self.loop_body(stmt, top)
+            self.patch(to_end)
+        elif isinstance(stmt, Loop):
+            self.loop_body(stmt, self.here())
+        elif isinstance(stmt, (Break, Continue)):
+            self.jump_out(stmt)
+        elif isinstance(stmt, Return) and self.scope is not None:
+            if id(stmt) in self.scope.tail_calls:
+                self.call(stmt.value, TAIL_CALL)
+            else:
+                self.expression(stmt.value)
+            self.emit(RETURN_VALUE)
+        else:
+            self.expression(stmt)
+            self.emit(POP)
+
+    def block(self, body):
+        for stmt in body:
+            self.statement(stmt)
+
+    def loop_body(self, stmt, top):
+        # Breaks resolved here are plain jumps; the handler catches signals raised inside calls
+        breaks = []
+        self.loops.append((stmt.label, breaks, top))
+        start = self.here()
+        self.block(stmt.body)
+        self.patch(self.emit(JUMP), top)
+        self.loops.pop()
+        for at in breaks:
+            self.patch(at)
+        self.code.handlers.append((start, self.here(), HANDLER_LOOP, self.depth, self.here(), top, stmt.label))
+
+    def jump_out(self, stmt):
+        is_break = isinstance(stmt, Break)
+        if stmt.depth is not None:
+            label, breaks, top = self.loops[-1 - stmt.depth]
+            if is_break:
+                breaks.append(self.emit(JUMP))
+            else:
+                self.patch(self.emit(JUMP), top)
+            return
+        # No enclosing loop in this function: the signal unwinds into the caller, like the tree walker
+        self.emit(RAISE_SIGNAL, self.const((is_break, stmt.label)))
+
+    # Expressions push exactly one value
+
+    def expression(self, expr):
+        if isinstance(expr, Var):
+            self.load(expr.name)
+        elif isinstance(expr, BinOp):
+            self.binop(expr)
+        elif isinstance(expr, Call):
+            self.call(expr, CALL)
+        elif isinstance(expr, Spawn):
+            self.call(expr.call, SPAWN)
+        elif isinstance(expr, Return):
+            self.expression(expr.value)
+        elif isinstance(expr, Text):
+            self.emit(LOAD_CONST, self.const(expr.value))
+        elif isinstance(expr, Interpolation):
+            for part in expr.parts:
+                if isinstance(part, str):
+                    self.emit(LOAD_CONST, self.const(part))
+                else:
+                    self.expression(part)
+                    self.emit(TO_STR)
+            self.emit(BUILD_STRING, len(expr.parts), 1 - len(expr.parts))
+        elif isinstance(expr, ArrayLiteral):
+            for item in expr.items:
+                self.expression(item)
+            self.emit(BUILD_ARRAY, len(expr.items), 1 - len(expr.items))
+        elif isinstance(expr, (BaseLiteral, int, str)):
+            self.emit(LOAD_CONST, self.const(expr))
+        elif isinstance(expr, (If, While, Loop)):
+            # Used as a value: runs like the statement and evaluates to None
+            self.statement(expr)
+            self.emit(LOAD_CONST, self.const(None))
+        else:
+            raise TypeError(f"Unsupported expression type: {expr}")
+
+    def call(self, expr, op):
+        for arg in expr.args:
+            self.expression(arg)
+        self.emit(op, self.const((expr.name, len(expr.args))), 1 - len(expr.args))
+
+    def binop(self, expr):
+        start, depth = self.here(), self.depth
+        op = expr.op
+        if op in (TokenType.AND, TokenType.OR):
+            self.expression(expr.left)
+            self.emit(TRUTHY)
+            skip = self.emit(JUMP_IF_FALSE_OR_POP if op == TokenType.AND else JUMP_IF_TRUE_OR_POP)
+            self.expression(expr.right)
+            self.emit(TRUTHY)
+            self.patch(skip)
+        elif op == TokenType.NOT:
+            self.expression(expr.right)
+            self.emit(NOT)
+        elif op in BINARY_INDEX:
+            self.expression(expr.left)
+            self.expression(expr.right)
+            self.emit(BINARY, BINARY_INDEX[op])
+        else:
+            raise TypeError(f"Unsupported operator: {op}")
+        if expr.pos is not None:
+            self.code.handlers.append((start, self.here(), HANDLER_ERROR, depth, self.here(), expr.pos, None))
+
+    def load(self, name):
+        if name in self.code.slot_index:
+            self.emit(LOAD_FAST, self.code.slot_index[name])
+        else:
+            self.emit(LOAD_GLOBAL, self.name(name))
+
+    def store(self, name):
+        if name in self.code.slot_index:
+            self.emit(STORE_FAST, self.code.slot_index[name])
+        else:
+            self.emit(STORE_GLOBAL, self.name(name))
+
+
+def compile_statement(stmt):
+    # Top-level code: variables live in the context dict and the statement's value is returned
+    compiler = Compiler("<module>")
+    if isinstance(stmt, (Assign, Function, Use, If, While, Loop, Break, Continue)):
+        compiler.statement(stmt)
+        compiler.emit(LOAD_CONST, compiler.const(None))
+    else:
+        compiler.expression(stmt)
+    compiler.emit(RETURN_VALUE)
+    return compiler.code
+
+
+def compile_function(fn):
+    scope = resolve(fn)
+    compiler = Compiler(fn.name, scope)
+    compiler.code.param_slots = scope.param_slots
+    compiler.block(fn.body)
+    compiler.emit(LOAD_CONST, compiler.const(None))
+    compiler.emit(RETURN_VALUE)
+    return compiler.code
+
+
+def disassemble(code, seen=None):
+    seen = set() if seen is None else seen
+    lines = [f"Disassembly of {code.name}:"]
+    if code.varnames:
+        lines.append(f"  slots: {', '.join(code.varnames)}")
+    targets = {i + 2 + code.ops[i + 1] for i in range(0, len(code.ops), 2) if code.ops[i] in JUMPS}
+    functions = []
+    for i in range(0, len(code.ops), 2):
+        op, arg = code.ops[i], code.ops[i + 1]
+        detail = ""
+        if op in JUMPS:
+            detail = f"(to {i + 2 + arg})"
+        elif op in (LOAD_CONST, CALL, TAIL_CALL, SPAWN, USE, DEFINE_FUNCTION, RAISE_SIGNAL):
+            value = code.consts[arg]
+            detail = f"({value.signature() if isinstance(value, Function) else repr(value)})"
+            if op == DEFINE_FUNCTION:
+                functions.append(value)
+        elif op in (LOAD_FAST, STORE_FAST):
+            detail = f"({code.varnames[arg]})"
+        elif op in (LOAD_GLOBAL, STORE_GLOBAL):
+            detail = f"({code.names[arg]})"
+        elif op == BINARY:
+            detail = f"({list(BINARY_OPERATORS)[arg].name})"
+        marker = ">>" if i in targets else "  "
+        lines.append(f"{marker}{i:6} {OPNAMES[op]:<22}{arg:>5} {detail}".rstrip())
+    for start, end, kind, depth, a, b, label in code.handlers:
+        if kind == HANDLER_ERROR:
+            lines.append(f"  handler {start}-{end}: error at source offset {b}, resume at {a} (depth {depth})")
+        else:
+            name = f"loop@{label}" if label else "loop"
+            lines.append(f"  handler {start}-{end}: {name} break to {a}, continue to {b} (depth {depth})")
+    for fn in functions:
+        if fn not in seen:
+            seen.add(fn)
+            lines.append("")
+            lines.append(disassemble(compile_function(fn), seen))
+    return "\n".join(lines)
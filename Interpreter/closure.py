@@ -0,0 +1,426 @@
+from Interpreter.runtime import (
+    BINARY_OPERATORS,
+    BreakSignal,
+    Completion,
+    ContinueSignal,
+    LoopJump,
+    ReturnValue,
+    TailCall,
+    call_memoized,
+    check_args,
+    loop_jump,
+    spawn_call,
+    truthy,
+)
+from Interpreter.scope import UNBOUND, new_frame, resolve
+from Mbase import plugins
+from Mbase.error import print_error_with_origin
+from Mbase.array import BaseArray
+from Mbase.types import BaseLiteral, Function
+from Parser.token_type import TokenType
+from Mbase.ast import (
+    ArrayLiteral,
+    Assign,
+    BinOp,
+    Break,
+    Call,
+    Continue,
+    If,
+    Interpolation,
+    Loop,
+    Return,
+    Spawn,
+    Use,
+    Text,
+    Var,
+    While,
+)
+
+# Closure-compiled engine: every node is turned into a Python closure once, so evaluating
+# it is a single call instead of an isinstance chain. Behaves exactly like evaluate().
+# Inside a function body ctx is its Frame and variables compile to slot or global accesses.
+
+_bodies = {}
+_no_functions = {}
+
+
+def evaluate_compiled(expr, ctx):
+    return compile_node(expr)(ctx)
+
+
+def compile_node(expr, scope=None):
+    compiler = _COMPILERS.get(type(expr))
+    if compiler is None:
+        if isinstance(expr, (int, str)):
+            return _compile_constant(expr)
+
+        def unsupported(ctx):
+            raise TypeError(f"Unsupported expression type: {expr}")
+        return unsupported
+    return compiler(expr, scope)
+
+
+def compile_body(body, scope):
+    return tuple(compile_node(stmt, scope) for stmt in body)
+
+
+def _compile_constant(value, scope=None):
+    return lambda ctx: value
+
+
+def _compile_function(fn, scope):
+    def define(ctx):
+        ctx.setdefault("__functions__", {})[fn.name] = fn
+        return None
+    return define
+
+
+def _compile_use(stmt, scope):
+    def use(ctx):
+        plugins.use(stmt.name, ctx.setdefault("__functions__", {}))
+        return None
+    return use
+
+
+def _compile_var(expr, scope):
+    name = expr.name
+    index = scope.index.get(name) if scope is not None else None
+
+    if index is not None:
+        def var(ctx):
+            value = ctx.values[index]
+            if value is UNBOUND:
+                try:
+                    return ctx.globals[name]
+                except KeyError:
+                    raise NameError(f"Undefined variable '{name}'") from None
+            return value
+    elif scope is not None:
+        def var(ctx):
+            try:
+                return ctx.globals[name]
+            except KeyError:
+                raise NameError(f"Undefined variable '{name}'") from None
+    else:
+        def var(ctx):
+            try:
+                return ctx[name]
+            except KeyError:
+                raise NameError(f"Undefined variable '{name}'") from None
+    return var
+
+
+def _compile_assign(expr, scope):
+    name = expr.name
+    value = compile_node(expr.value, scope)
+    if isinstance(expr.value, (If, While, Loop)):
+        return _compile_control_assign(name, value, scope)
+
+    if scope is not None:
+        index = scope.index[name]
+
+        def assign(ctx):
+            ctx.values[index] = value(ctx)
+            return None
+    else:
+        def assign(ctx):
+            ctx[name] = value(ctx)
+            return None
+    return assign
+
+
+def _compile_control_assign(name, value, scope):
+    # An if or loop used as the value: a ret, break or continue inside it ends the assignment too
+    index = scope.index[name] if scope is not None else None
+
+    def assign(ctx):
+        result = value(ctx)
+        if isinstance(result, Completion):
+            return result
+        if index is not None:
+            ctx.values[index] = result
+        else:
+            ctx[name] = result
+        return None
+    return assign
+
+
+def _compile_binop(expr, scope):
+    op = expr.op
+    pos = expr.pos
+    left = compile_node(expr.left, scope)
+    right = compile_node(expr.right, scope)
+
+    if op == TokenType.AND:
+        def apply(ctx):
+            return truthy(left(ctx)) and truthy(right(ctx))
+    elif op == TokenType.OR:
+        def apply(ctx):
+            return truthy(left(ctx)) or truthy(right(ctx))
+    elif op == TokenType.NOT:
+        def apply(ctx):
+            return not truthy(right(ctx))
+    elif op in BINARY_OPERATORS:
+        func = BINARY_OPERATORS[op]
+
+        def apply(ctx):
+            return func(left(ctx), right(ctx))
+    else:
+        def apply(ctx):
+            raise TypeError(f"Unsupported operator: {op}")
+
+    if pos is None:
+        return apply
+
+    def binop(ctx):
+        try:
+            return apply(ctx)
+        except Exception as e:
+            print_error_with_origin(
+                ctx.get("__source__", ""), pos, str(e), ctx.get("__filename__", "<input>")
+            )
+            return None
+    return binop
+
+
+def _compile_prepare(expr, scope):
+    name = expr.name
+
+    if scope is not None:
+        def prepare(ctx, args):
+            fn = ctx.globals.get("__functions__", _no_functions).get(name)
+            if fn is None:
+                raise NameError(f"Unknown function '{name}'")
+            if not fn.native:
+                check_args(fn, args)
+            return fn
+    else:
+        def prepare(ctx, args):
+            fn = ctx.get("__functions__", _no_functions).get(name)
+            if fn is None:
+                raise NameError(f"Unknown function '{name}'")
+            if not fn.native:
+                check_args(fn, args)
+            return fn
+    return prepare
+
+
+def _compile_call(expr, scope):
+    arg_fns = tuple(compile_node(arg, scope) for arg in expr.args)
+    prepare = _compile_prepare(expr, scope)
+
+    def call(ctx):
+        args = [arg(ctx) for arg in arg_fns]
+        fn = prepare(ctx, args)
+        if fn.builtin:
+            try:
+                return fn.impl(*args)
+            except (TypeError, AttributeError):
+                # A native function's arguments are only checked once it has failed
+                if fn.native:
+                    check_args(fn, args)
+                raise
+        return call_function(fn, args, ctx)
+    return call
+
+
+def _compile_spawn(expr, scope):
+    arg_fns = tuple(compile_node(arg, scope) for arg in expr.call.args)
+    prepare = _compile_prepare(expr.call, scope)
+
+    def spawn(ctx):
+        args = [arg(ctx) for arg in arg_fns]
+        return spawn_call(prepare(ctx, args), args, ctx, call_function)
+    return spawn
+
+
+def call_function(fn, args, ctx):
+    if fn.pure:
+        return call_memoized(fn, args, ctx, run_function)
+    return run_function(fn, args, ctx)
+
+
+def run_function(fn, args, ctx):
+    # Tail calls come back as TailCall and run here, in place of the finished call
+    while True:
+        body = _bodies.get(fn)
+        if body is None:
+            body = _bodies[fn] = compile_body(fn.body, resolve(fn))
+
+        frame = new_frame(fn, args, ctx)
+        for stmt in body:
+            result = stmt(frame)
+            if isinstance(result, Completion):
+                break
+        else:
+            return None
+
+        if not isinstance(result, TailCall):
+            return result.value
+        fn, args = result.fn, result.args
+
+
+def _compile_return(expr, scope):
+    if scope is None:
+        return compile_node(expr.value, scope)
+
+    if id(expr) in scope.tail_calls:
+        arg_fns = tuple(compile_node(arg, scope) for arg in expr.value.args)
+        prepare = _compile_prepare(expr.value, scope)
+
+        def tail_call(ctx):
+            args = [arg(ctx) for arg in arg_fns]
+            fn = prepare(ctx, args)
+            if fn.builtin:
+                try:
+                    return ReturnValue(fn.impl(*args))
+                except (TypeError, AttributeError):
+                    if fn.native:
+                        check_args(fn, args)
+                    raise
+            return TailCall(fn, args)
+        return tail_call
+
+    value = compile_node(expr.value, scope)
+
+    def return_(ctx):
+        return ReturnValue(value(ctx))
+    return return_
+
+
+def _compile_text(expr, scope):
+    return _compile_constant(expr.value)
+
+
+def _compile_interpolation(expr, scope):
+    parts = tuple((True, part) if isinstance(part, str) else (False, compile_node(part, scope)) for part in expr.parts)
+
+    def interpolation(ctx):
+        return "".join([part if literal else str(part(ctx)) for literal, part in parts])
+    return interpolation
+
+
+def _compile_array(expr, scope):
+    items = compile_body(expr.items, scope)
+
+    def array(ctx):
+        return BaseArray.of([item(ctx) for item in items])
+    return array
+
+
+def _compile_if(expr, scope):
+    condition = compile_node(expr.condition, scope)
+    then_body = compile_body(expr.then_body, scope)
+    else_body = compile_body(expr.else_body, scope) if expr.else_body else ()
+
+    def if_(ctx):
+        for stmt in then_body if truthy(condition(ctx)) else else_body:
+            result = stmt(ctx)
+            if isinstance(result, Completion):
+                return result
+        return None
+    return if_
+
+
+def _compile_while(expr, scope):
+    label = expr.label
+    condition = compile_node(expr.condition, scope)
+    body = compile_body(expr.body, scope)
+
+    def while_(ctx):
+        while truthy(condition(ctx)):
+            try:
+                for stmt in body:
+                    result = stmt(ctx)
+                    if isinstance(result, Completion):
+                        break
+                else:
+                    continue
+            except ContinueSignal as c:
+                if c.label is None or c.label == label:
+                    continue
+                raise
+            except BreakSignal as b:
+                if b.label is None or b.label == label:
+                    break
+                raise
+            if type(result) is not LoopJump:
+                return result
+            if result.depth:
+                return result.outer
+            if result.is_break:
+                break
+        return None
+    return while_
+
+
+def _compile_loop(expr, scope):
+    label = expr.label
+    body = compile_body(expr.body, scope)
+
+    def loop(ctx):
+        while True:
+            try:
+                for stmt in body:
+                    result = stmt(ctx)
+                    if isinstance(result, Completion):
+                        break
+                else:
+                    continue
+            except ContinueSignal as c:
+                if c.label is None or c.label == label:
+                    continue
+                raise
+            except BreakSignal as b:
+                if b.label is None or b.label == label:
+                    break
+                raise
+            if type(result) is not LoopJump:
+                return result
+            if result.depth:
+                return result.outer
+            if result.is_break:
+                break
+        return None
+    return loop
+
+
+def _compile_break(expr, scope):
+    label = expr.label
+    if expr.depth is not None:
+        return _compile_constant(loop_jump(expr, True))
+
+    def break_(ctx):
+        raise BreakSignal(label)
+    return break_
+
+
+def _compile_continue(expr, scope):
+    label = expr.label
+    if expr.depth is not None:
+        return _compile_constant(loop_jump(expr, False))
+
+    def continue_(ctx):
+        raise ContinueSignal(label)
+    return continue_
+
+
+_COMPILERS = {
+    BaseLiteral: _compile_constant,
+    Function: _compile_function,
+    Use: _compile_use,
+    Var: _compile_var,
+    Assign: _compile_assign,
+    BinOp: _compile_binop,
+    Call: _compile_call,
+    Spawn: _compile_spawn,
+    Return: _compile_return,
+    Text: _compile_text,
+    Interpolation: _compile_interpolation,
+    ArrayLiteral: _compile_array,
+    If: _compile_if,
+    While: _compile_while,
+    Loop: _compile_loop,
+    Break: _compile_break,
+    Continue: _compile_continue,
+}
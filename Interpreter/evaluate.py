@@ -1,28 +1,41 @@
 from Mbase.error import print_error_with_origin
+from Interpreter.runtime import (
+    BreakSignal,
+    Completion,
+    ContinueSignal,
+    LoopJump,
+    ReturnValue,
+    TailCall,
+    call_memoized,
+    check_args,
+    loop_jump,
+    spawn_call,
+    truthy,
+)
+from Interpreter.scope import Frame, new_frame
+from Mbase import plugins
+from Mbase.array import BaseArray
 from Mbase.types import BaseLiteral, Function
 from Parser.token_type import TokenType
-from Parser.string import extract_string_parts
 from Mbase.ast import (
+    ArrayLiteral,
     Assign,
     BinOp,
     Break,
     Call,
     Continue,
     If,
+    Interpolation,
     Loop,
     Return,
+    Spawn,
+    Use,
     Text,
     Var,
     While,
 )
 
-class BreakSignal(Exception):
-    def __init__(self, label=None):
-        self.label = label
-
-class ContinueSignal(Exception):
-    def __init__(self, label=None):
-        self.label = label
+_no_functions = {}
 
 def evaluate(expr, ctx):
     if isinstance(expr, BaseLiteral):
@@ -30,6 +43,9 @@ def evaluate(expr, ctx):
     elif isinstance(expr, Function):
         ctx.setdefault("__functions__", {})[expr.name] = expr
         return None
+    elif isinstance(expr, Use):
+        plugins.use(expr.name, ctx.setdefault("__functions__", {}))
+        return None
     elif isinstance(expr, int):
         return expr
     elif isinstance(expr, str):
@@ -43,6 +59,9 @@ def evaluate(expr, ctx):
 
     elif isinstance(expr, Assign):
         value = evaluate(expr.value, ctx)
+        if isinstance(value, Completion):
+            # ret, break or continue inside an if or loop used as the value ends the assignment too
+            return value
         ctx[expr.name] = value
         return None
 
@@ -95,66 +114,50 @@ def evaluate(expr, ctx):
                 raise
 
     elif isinstance(expr, Call):
-        name = expr.name
-        args_exprs = expr.args
-        args = [evaluate(arg, ctx) for arg in args_exprs]
-
-        functions = ctx.get("__functions", ctx.get("__functions__", {}))
-        fn = functions.get(name)
-        if fn is None:
-            raise NameError(f"Unknown function '{name}'")
-
-        if len(args) != len(fn.args):
-            raise TypeError(f"'{name}' expects {len(fn.args)} argument(s), got {len(args)}")
-
-        for i, ((expected_type, _), arg) in enumerate(zip(fn.args, args)):
-            if expected_type.startswith("b"):
-                if not isinstance(arg, BaseLiteral):
-                    raise TypeError(f"Argument {i + 1} must be BaseLiteral")
-                if expected_type != "b_" and arg.base != int(expected_type[1:]):
-                    raise TypeError(
-                        f"Argument {i + 1} must be base {expected_type[1:]}, got base {arg.base}"
-                    )
-            elif expected_type == "str":
-                if not isinstance(arg, str):
-                    raise TypeError(
-                        f"Argument {i + 1} must be str, got {type(arg).__name__}"
-                    )
-            else:
-                raise TypeError(f"Unknown expected type '{expected_type}'")
-
+        fn, args = prepare_call(expr, ctx)
         if fn.builtin:
-            return fn.impl(*args)
-
-        local_ctx = ctx.copy()
-        for (_, var), val in zip(fn.args, args):
-            local_ctx[var] = val
-
-        result = None
-        for stmt in fn.body:
-            val = evaluate(stmt, local_ctx)
-            if isinstance(stmt, Return):
-                result = val
-                break
+            try:
+                return fn.impl(*args)
+            except (TypeError, AttributeError):
+                # A native function's arguments are only checked once it has failed
+                if fn.native:
+                    check_args(fn, args)
+                raise
+        return call_function(fn, args, ctx)
 
-        return result
+    elif isinstance(expr, Spawn):
+        fn, args = prepare_call(expr.call, ctx)
+        return spawn_call(fn, args, ctx, call_function)
 
     elif isinstance(expr, Return):
-        return evaluate(expr.value, ctx)
+        if not isinstance(ctx, Frame):
+            return evaluate(expr.value, ctx)
+        if id(expr) in ctx.scope.tail_calls:
+            fn, args = prepare_call(expr.value, ctx)
+            if not fn.builtin:
+                return TailCall(fn, args)
+            try:
+                return ReturnValue(fn.impl(*args))
+            except (TypeError, AttributeError):
+                if fn.native:
+                    check_args(fn, args)
+                raise
+        return ReturnValue(evaluate(expr.value, ctx))
 
     elif isinstance(expr, Text):
-        parts = extract_string_parts(expr.value)
-        if parts is None:
-            return None
-        return evaluate_text(parts, ctx)
+        return expr.value
+
+    elif isinstance(expr, Interpolation):
+        return evaluate_text(expr.parts, ctx)
+
+    elif isinstance(expr, ArrayLiteral):
+        return BaseArray.of([evaluate(item, ctx) for item in expr.items])
 
     elif isinstance(expr, If):
         if truthy(evaluate(expr.condition, ctx)):
-            for stmt in expr.then_body:
-                evaluate(stmt, ctx)
+            return evaluate_block(expr.then_body, ctx)
         elif expr.else_body:
-            for stmt in expr.else_body:
-                evaluate(stmt, ctx)
+            return evaluate_block(expr.else_body, ctx)
         return None
 
     elif isinstance(expr, While):
@@ -164,8 +167,7 @@ def evaluate(expr, ctx):
 
         while truthy(evaluate(cond_expr, ctx)):
             try:
-                for stmt_ in body:
-                    evaluate(stmt_, ctx)
+                result = evaluate_block(body, ctx)
             except ContinueSignal as c:
                 if c.label is None or c.label == label:
                     continue
@@ -174,6 +176,13 @@ def evaluate(expr, ctx):
                 if b.label is None or b.label == label:
                     break
                 raise
+            if result is not None:
+                if type(result) is not LoopJump:
+                    return result
+                if result.depth:
+                    return result.outer
+                if result.is_break:
+                    break
         return None
 
     elif isinstance(expr, Loop):
@@ -181,8 +190,7 @@ def evaluate(expr, ctx):
         body = expr.body
         while True:
             try:
-                for stmt_ in body:
-                    evaluate(stmt_, ctx)
+                result = evaluate_block(body, ctx)
             except ContinueSignal as c:
                 if c.label is None or c.label == label:
                     continue
@@ -191,30 +199,58 @@ def evaluate(expr, ctx):
                 if b.label is None or b.label == label:
                     break
                 raise
+            if result is not None:
+                if type(result) is not LoopJump:
+                    return result
+                if result.depth:
+                    return result.outer
+                if result.is_break:
+                    break
         return None
 
     elif isinstance(expr, Break):
-        raise BreakSignal(expr.label)
+        if expr.depth is None:
+            raise BreakSignal(expr.label)
+        return loop_jump(expr, True)
 
     elif isinstance(expr, Continue):
-        raise ContinueSignal(expr.label)
+        if expr.depth is None:
+            raise ContinueSignal(expr.label)
+        return loop_jump(expr, False)
 
     raise TypeError(f"Unsupported expression type: {expr}")
 
+def evaluate_block(body, ctx):
+    for stmt in body:
+        result = evaluate(stmt, ctx)
+        if isinstance(result, Completion):
+            return result
+    return None
+
+def prepare_call(expr, ctx):
+    args = [evaluate(arg, ctx) for arg in expr.args]
+
+    globals_ = ctx.globals if isinstance(ctx, Frame) else ctx
+    fn = globals_.get("__functions__", _no_functions).get(expr.name)
+    if fn is None:
+        raise NameError(f"Unknown function '{expr.name}'")
+
+    if not fn.native:
+        check_args(fn, args)
+    return fn, args
+
+def call_function(fn, args, ctx):
+    if fn.pure:
+        return call_memoized(fn, args, ctx, run_function)
+    return run_function(fn, args, ctx)
+
+def run_function(fn, args, ctx):
+    # Tail calls replace the frame instead of nesting another evaluate() call
+    while True:
+        result = evaluate_block(fn.body, new_frame(fn, args, ctx))
+        if not isinstance(result, TailCall):
+            return result.value if result is not None else None
+        fn, args = result.fn, result.args
+
 def evaluate_text(parts, ctx):
-    result = ""
-    for part in parts:
-        if isinstance(part, str):
-            result += part
-        else:
-            result += str(evaluate(part, ctx))
-    return result
-
-def truthy(value):
-    if value is None:
-        return False
-    if isinstance(value, BaseLiteral):
-        return value.to_int() != 0
-    if isinstance(value, int):
-        return value != 0
-    return bool(value)
+    return "".join([part if isinstance(part, str) else str(evaluate(part, ctx)) for part in parts])
@@ -0,0 +1,227 @@
+from Interpreter.runtime import BINARY_OPERATORS, check_args, truthy
+from Mbase.builtin import BUILTINS
+from Mbase.types import BaseLiteral, Function
+from Parser.token_type import TokenType
+from Mbase.ast import (
+    ArrayLiteral,
+    Assign,
+    BinOp,
+    Call,
+    If,
+    Interpolation,
+    Loop,
+    Return,
+    Spawn,
+    Text,
+    Use,
+    While,
+)
+
+# -O1 pass between the parser and the engines: folds operators and pure built-ins applied to
+# literals, and drops the branches and loops a constant condition rules out. Nothing that raises
+# is folded, so errors still surface when and where the program reaches them.
+
+PURE_BUILTINS = {
+    name: BUILTINS[name]
+    for name in (
+        "len", "num_len", "str", "str_baseless", "padstr", "sqrt", "mod", "pow", "gcd", "is_prime", "factorial",
+        "number", "rebase",
+    )
+}
+
+# Folding runs before the program does, even for calls it never reaches, so it has to stay cheap:
+# a call is left alone when a number argument has over FOLD_BITS bits, a string argument over
+# FOLD_CHARS characters, or when its result could have over FOLD_RESULT bits or characters
+FOLD_BITS = 256
+FOLD_CHARS = 1024
+FOLD_RESULT = 4096
+# Upper bounds of the result size of built-ins whose result can be much larger than their arguments
+RESULT_SIZE = {
+    "padstr": lambda text, length: length.value,
+    "factorial": lambda n: n.value * max(n.value.bit_length(), 1),
+}
+
+
+def optimize(statements, whole_program=False):
+    # Calls to built-ins are only folded with the whole program at hand: a fn defined anywhere in
+    # it, even after the call, replaces the built-in, and so may a plugin loaded with `use`
+    defined = None
+    if whole_program:
+        statements = list(statements)
+        defined = defined_functions(statements)
+    optimizer = Optimizer(defined)
+    for stmt in statements:
+        yield from optimizer.statement(stmt)
+
+
+def defined_functions(statements):
+    # Names of the top-level functions, or None when a plugin can add more
+    names = set()
+    for stmt in statements:
+        if isinstance(stmt, Use):
+            return None
+        if isinstance(stmt, Function) and not stmt.builtin:
+            names.add(stmt.name)
+    return names
+
+
+def is_constant(expr):
+    # bool is what a folded comparison leaves behind
+    return isinstance(expr, (BaseLiteral, Text, bool))
+
+
+def constant_value(expr):
+    return expr.value if isinstance(expr, Text) else expr
+
+
+def size(value):
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, BaseLiteral):
+        return value.value.bit_length()
+    return 0
+
+
+def cheap_to_fold(name, values):
+    for value in values:
+        if size(value) > (FOLD_CHARS if isinstance(value, str) else FOLD_BITS):
+            return False
+    result_size = RESULT_SIZE.get(name)
+    return result_size is None or result_size(*values) <= FOLD_RESULT
+
+
+def constant_node(value):
+    if isinstance(value, str):
+        return Text(value)
+    if isinstance(value, (BaseLiteral, bool)):
+        return value
+    return None
+
+
+class Optimizer:
+    def __init__(self, defined=None):
+        # Names of every user function in the program; calls to them are never folded, even when
+        # they shadow a built-in. None when they are not known, and no built-in call is folded.
+        self.defined = defined
+
+    def block(self, body):
+        result = []
+        for stmt in body:
+            result += self.statement(stmt)
+        return result
+
+    def statement(self, stmt):
+        # Returns the statements that replace stmt
+        if isinstance(stmt, If):
+            condition = self.expression(stmt.condition)
+            if is_constant(condition):
+                taken = stmt.then_body if truthy(constant_value(condition)) else stmt.else_body
+                return self.block(taken or ())
+            else_body = self.block(stmt.else_body) if stmt.else_body else stmt.else_body
+            return [If(stmt.label, condition, self.block(stmt.then_body), else_body)]
+
+        if isinstance(stmt, While):
+            condition = self.expression(stmt.condition)
+            if is_constant(condition):
+                if not truthy(constant_value(condition)):
+                    return []
+                return [Loop(stmt.label, self.block(stmt.body))]
+            return [While(stmt.label, condition, self.block(stmt.body))]
+
+        return [self.expression(stmt)]
+
+    def expression(self, expr):
+        if isinstance(expr, BinOp):
+            return self.binop(expr)
+        if isinstance(expr, Call):
+            return self.call(expr)
+        if isinstance(expr, Interpolation):
+            return self.interpolation(expr)
+        if isinstance(expr, ArrayLiteral):
+            return ArrayLiteral([self.expression(item) for item in expr.items])
+        if isinstance(expr, Spawn):
+            # Only the arguments: the call has to stay a call, even to a pure built-in
+            call = expr.call
+            return Spawn(Call(call.name, [self.expression(arg) for arg in call.args], call.pos))
+        if isinstance(expr, Assign):
+            return Assign(expr.name, self.expression(expr.value))
+        if isinstance(expr, Return):
+            return Return(self.expression(expr.value), expr.pos)
+        if isinstance(expr, Function):
+            if expr.builtin:
+                return expr
+            return Function(expr.name, expr.args, expr.return_type, self.block(expr.body), pure=expr.pure)
+
+        # Control flow used as a value keeps its shape
+        if isinstance(expr, If):
+            else_body = self.block(expr.else_body) if expr.else_body else expr.else_body
+            return If(expr.label, self.expression(expr.condition), self.block(expr.then_body), else_body)
+        if isinstance(expr, While):
+            return While(expr.label, self.expression(expr.condition), self.block(expr.body))
+        if isinstance(expr, Loop):
+            return Loop(expr.label, self.block(expr.body))
+        return expr
+
+    def binop(self, expr):
+        op = expr.op
+        left = self.expression(expr.left) if expr.left is not None else None
+        right = self.expression(expr.right)
+        node = BinOp(op, left, right, expr.pos)
+
+        if op == TokenType.AND or op == TokenType.OR:
+            # The right operand is never evaluated once the left one decides
+            if is_constant(left):
+                decided = truthy(constant_value(left))
+                if decided == (op == TokenType.OR):
+                    return decided
+                if is_constant(right):
+                    return truthy(constant_value(right))
+            return node
+        if op == TokenType.NOT:
+            return not truthy(constant_value(right)) if is_constant(right) else node
+
+        func = BINARY_OPERATORS.get(op)
+        if func is None or not is_constant(left) or not is_constant(right):
+            return node
+        try:
+            value = func(constant_value(left), constant_value(right))
+        except Exception:
+            return node
+        folded = constant_node(value)
+        return node if folded is None else folded
+
+    def call(self, expr):
+        args = [self.expression(arg) for arg in expr.args]
+        node = Call(expr.name, args, expr.pos)
+
+        fn = PURE_BUILTINS.get(expr.name)
+        if fn is None or self.defined is None or expr.name in self.defined or BUILTINS.get(expr.name) is not fn:
+            return node
+        if not all(is_constant(arg) for arg in args):
+            return node
+        values = [constant_value(arg) for arg in args]
+        try:
+            check_args(fn, values)
+            if not cheap_to_fold(expr.name, values):
+                return node
+            value = fn.impl(*values)
+        except Exception:
+            return node
+        folded = constant_node(value)
+        return node if folded is None or size(value) > FOLD_RESULT else folded
+
+    def interpolation(self, expr):
+        parts = []
+        for part in expr.parts:
+            if not isinstance(part, str):
+                part = self.expression(part)
+                if is_constant(part):
+                    part = str(constant_value(part))
+            if isinstance(part, str) and parts and isinstance(parts[-1], str):
+                parts[-1] += part
+            else:
+                parts.append(part)
+
+        if all(isinstance(part, str) for part in parts):
+            return Text("".join(parts))
+        return Interpolation(parts)
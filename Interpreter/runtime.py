@@ -0,0 +1,208 @@
+import operator
+from collections import OrderedDict
+
+from Mbase import config, tasks
+from Mbase.array import BaseArray
+from Mbase.types import ANY, ARRAY, STR, BaseLiteral
+from Parser.token_type import TokenType
+
+# Shared by the evaluation engines; AND/OR short-circuit and are handled by each engine
+BINARY_OPERATORS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    TokenType.SLASH: operator.truediv,
+    TokenType.EQUAL: lambda left, right: left.to_int() == right.to_int(),
+    TokenType.STRICT_EQUAL: operator.eq,
+    TokenType.NOTEQUAL: lambda left, right: left.to_int() != right.to_int(),
+    TokenType.STRICT_NOTEQUAL: operator.ne,
+    TokenType.LESSTHAN: lambda left, right: left.to_int() < right.to_int(),
+    TokenType.LEQ: lambda left, right: left.to_int() <= right.to_int(),
+    TokenType.GREATERTHAN: lambda left, right: left.to_int() > right.to_int(),
+    TokenType.GEQ: lambda left, right: left.to_int() >= right.to_int(),
+}
+
+
+class BreakSignal(Exception):
+    def __init__(self, label=None):
+        self.label = label
+
+
+class ContinueSignal(Exception):
+    def __init__(self, label=None):
+        self.label = label
+
+
+class Completion:
+    # What a statement inside a function hands back when it ends the function
+    __slots__ = ()
+
+
+class ReturnValue(Completion):
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class TailCall(Completion):
+    # ret f(...) in tail position: the caller runs f in place of the current call
+    __slots__ = ("fn", "args")
+
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = args
+
+
+class LoopJump(Completion):
+    # break/continue aimed at the loop depth levels out from the innermost one; outer is the
+    # same jump as seen by the next loop out
+    __slots__ = ("is_break", "depth", "outer")
+
+    def __init__(self, is_break, depth):
+        self.is_break = is_break
+        self.depth = depth
+        self.outer = LoopJump(is_break, depth - 1) if depth else None
+
+
+_jumps = {}
+
+
+def loop_jump(stmt, is_break):
+    jump = _jumps.get((is_break, stmt.depth))
+    if jump is None:
+        jump = _jumps[is_break, stmt.depth] = LoopJump(is_break, stmt.depth)
+    return jump
+
+
+NOT_CACHED = object()
+
+_memos = {}
+
+
+class Memo:
+    # Results of one pure function keyed by its argument tuple, least recently used first
+    __slots__ = ("size", "results", "hits", "misses")
+
+    def __init__(self, size):
+        self.size = size
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        try:
+            value = self.results[key]
+        except KeyError:
+            self.misses += 1
+            return NOT_CACHED
+        self.results.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def store(self, key, value):
+        results = self.results
+        results[key] = value
+        if len(results) > self.size:
+            results.popitem(last=False)
+
+
+def memo_of(fn):
+    memo = _memos.get(fn)
+    if memo is None:
+        memo = _memos[fn] = Memo(config.get_config().memo_size)
+    return memo
+
+
+def call_memoized(fn, args, ctx, call):
+    # Only the call into fn is memoized; a pure function reached through a tail call just runs
+    memo = memo_of(fn)
+    key = tuple(args)
+    value = memo.lookup(key)
+    if value is NOT_CACHED:
+        value = call(fn, args, ctx)
+        memo.store(key, value)
+    return value
+
+
+def native_entry(fn):
+    # fn.impl as the engines call a native function: its arguments are checked once it has failed
+    impl = fn.impl
+
+    def entry(*args):
+        try:
+            return impl(*args)
+        except (TypeError, AttributeError):
+            check_args(fn, args)
+            raise
+    return entry
+
+
+def spawn_call(fn, args, ctx, call):
+    # spawn f(...): the arguments are already evaluated, the call itself runs as a task
+    if fn.builtin:
+        impl = native_entry(fn) if fn.native else fn.impl
+        return tasks.spawn(fn.name, lambda: impl(*args))
+    return tasks.spawn(fn.name, lambda: call(fn, args, ctx))
+
+
+def memo_stats():
+    return [
+        f"{fn.name}: {memo.hits} hits, {memo.misses} misses, {len(memo.results)}/{memo.size} cached"
+        for fn, memo in _memos.items()
+    ]
+
+
+def check_args(fn, args):
+    params = fn.params
+    if len(args) != len(params):
+        raise TypeError(f"'{fn.name}' expects {len(params)} argument(s), got {len(args)}")
+
+    for expected, arg in zip(params, args):
+        if expected == STR:
+            if not isinstance(arg, str):
+                break
+        elif expected == ARRAY:
+            if not isinstance(arg, BaseArray):
+                break
+        elif expected == ANY:
+            continue
+        elif not isinstance(arg, BaseLiteral) or (expected and arg.base != expected):
+            break
+    else:
+        return
+    _reject_args(fn, args)
+
+
+def _reject_args(fn, args):
+    # Slow path of check_args: find the first bad argument and say why
+    for i, ((expected_type, _), arg) in enumerate(zip(fn.args, args)):
+        if expected_type.startswith("b"):
+            if not isinstance(arg, BaseLiteral):
+                raise TypeError(f"Argument {i + 1} must be BaseLiteral")
+            if expected_type != "b_" and arg.base != int(expected_type[1:]):
+                raise TypeError(
+                    f"Argument {i + 1} must be base {expected_type[1:]}, got base {arg.base}"
+                )
+        elif expected_type == "str":
+            if not isinstance(arg, str):
+                raise TypeError(
+                    f"Argument {i + 1} must be str, got {type(arg).__name__}"
+                )
+        elif expected_type == "arr":
+            if not isinstance(arg, BaseArray):
+                raise TypeError(
+                    f"Argument {i + 1} must be arr, got {type(arg).__name__}"
+                )
+        elif expected_type != "any":
+            raise TypeError(f"Unknown expected type '{expected_type}'")
+
+
+def truthy(value):
+    if value is None:
+        return False
+    if isinstance(value, BaseLiteral):
+        return value.to_int() != 0
+    if isinstance(value, int):
+        return value != 0
+    return bool(value)
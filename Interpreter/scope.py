@@ -0,0 +1,104 @@
+from Mbase.ast import Assign, Call, If, Loop, Return, While
+
+# Scope resolution: a name a function assigns (or takes as a parameter) lives in a slot of the
+# function's frame, every other name is a global. A slot that has not been assigned yet reads
+# the global of the same name, which is what the old copied context gave functions.
+
+UNBOUND = object()
+
+_scopes = {}
+
+
+class Scope:
+    # param_slots[i] is the slot of parameter i; tail_calls holds the ids of the function's
+    # Return nodes that are tail calls
+    __slots__ = ("names", "index", "param_slots", "tail_calls")
+
+    def __init__(self, names, tail_calls=(), params=()):
+        self.index = {}
+        for name in names:
+            self.index.setdefault(name, len(self.index))
+        self.names = list(self.index)
+        self.param_slots = tuple(self.index[name] for name in params)
+        self.tail_calls = set(tail_calls)
+
+
+class Frame:
+    # A function call's variables: values[i] belongs to scope.names[i]. Supports the few dict
+    # operations the tree walker uses on a context, so it can stand in for one.
+    __slots__ = ("scope", "values", "globals")
+
+    def __init__(self, scope, globals):
+        self.scope = scope
+        self.values = [UNBOUND] * len(scope.names)
+        self.globals = globals
+
+    def __getitem__(self, name):
+        index = self.scope.index.get(name)
+        if index is not None:
+            value = self.values[index]
+            if value is not UNBOUND:
+                return value
+        return self.globals[name]
+
+    def __contains__(self, name):
+        index = self.scope.index.get(name)
+        if index is not None and self.values[index] is not UNBOUND:
+            return True
+        return name in self.globals
+
+    def __setitem__(self, name, value):
+        index = self.scope.index.get(name)
+        if index is None:
+            self.globals[name] = value
+        else:
+            self.values[index] = value
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def setdefault(self, name, default=None):
+        return self.globals.setdefault(name, default)
+
+
+def assigned_names(body, names):
+    for stmt in body:
+        if isinstance(stmt, Assign):
+            names.append(stmt.name)
+            if isinstance(stmt.value, (If, While, Loop)):
+                assigned_names([stmt.value], names)
+        elif isinstance(stmt, If):
+            assigned_names(stmt.then_body, names)
+            assigned_names(stmt.else_body or (), names)
+        elif isinstance(stmt, (While, Loop)):
+            assigned_names(stmt.body, names)
+    return names
+
+
+def tail_calls(body, found):
+    # ret f(...) outside of any loop; inside one, a break signal from f must still reach the loop
+    for stmt in body:
+        if isinstance(stmt, Return) and isinstance(stmt.value, Call):
+            found.append(id(stmt))
+        elif isinstance(stmt, If):
+            tail_calls(stmt.then_body, found)
+            tail_calls(stmt.else_body or (), found)
+    return found
+
+
+def resolve(fn):
+    scope = _scopes.get(fn)
+    if scope is None:
+        params = [name for _, name in fn.args]
+        body = fn.body or ()
+        scope = _scopes[fn] = Scope(params + assigned_names(body, []), tail_calls(body, []), params)
+    return scope
+
+
+def new_frame(fn, args, ctx):
+    scope = resolve(fn)
+    frame = Frame(scope, ctx.globals if isinstance(ctx, Frame) else ctx)
+    values = frame.values
+    for index, val in zip(scope.param_slots, args):
+        values[index] = val
+    return frame
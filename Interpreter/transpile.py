@@ -0,0 +1,648 @@
+import ast as py
+import re
+from types import FunctionType
+
+from Interpreter.runtime import (
+    NOT_CACHED, BreakSignal, ContinueSignal, TailCall, check_args, memo_of, native_entry, spawn_call, truthy,
+)
+from Interpreter.scope import assigned_names, resolve
+from Mbase import plugins
+from Mbase.error import print_error_with_origin
+from Mbase.array import BaseArray
+from Mbase.types import BaseLiteral, Function
+from Parser.token_type import TokenType
+from Mbase.ast import (
+    ArrayLiteral,
+    Assign,
+    BinOp,
+    Break,
+    Call,
+    Continue,
+    If,
+    Interpolation,
+    Loop,
+    Return,
+    Spawn,
+    Use,
+    Text,
+    Var,
+    While,
+)
+
+# Lowers MBase ASTs to Python ast trees and runs the compiled code objects with the context
+# dict as their globals. Generated names contain ':' so they never clash with MBase names:
+#   fn:<name>   global bound to the Python callable for an MBase function
+#   tb:<name>   its body; it returns a TailCall for ret f(...) in tail position, which the
+#               fn:<name> trampoline of the function that made the first call runs
+#   pu:<name>   the entry of a pure function; fn:<name> is its memoizing wrapper, so calls in
+#               the body (a local cell under fn:<name> would catch them) go through the memo
+#   rt:<name>   runtime helper, k:<i> constant, t:<i> temporary, p:<i> shadowed parameter
+# Names are resolved as in Interpreter/scope.py; a slot that may be read before it is assigned
+# is loaded from the global of the same name on entry.
+
+FN = "fn:"
+BODY = "tb:"
+PURE = "pu:"
+MISSING = object()
+HELPERS = (
+    "rt:truthy", "rt:error", "rt:define", "rt:arity", "rt:missing", "rt:globals", "rt:Break", "rt:Continue",
+    "rt:BaseLiteral", "rt:isinstance", "rt:type", "rt:str", "rt:TypeError", "rt:Exception", "rt:TailCall",
+    "rt:BaseArray", "rt:array", "rt:spawn", "rt:use",
+)
+RESERVED = {"None", "True", "False", "__debug__"}
+COMPARISONS = {
+    TokenType.EQUAL: py.Eq,
+    TokenType.NOTEQUAL: py.NotEq,
+    TokenType.LESSTHAN: py.Lt,
+    TokenType.LEQ: py.LtE,
+    TokenType.GREATERTHAN: py.Gt,
+    TokenType.GEQ: py.GtE,
+}
+ARITHMETIC = {
+    TokenType.PLUS: py.Add,
+    TokenType.MINUS: py.Sub,
+    TokenType.STAR: py.Mult,
+    TokenType.SLASH: py.Div,
+}
+STRICT = {TokenType.STRICT_EQUAL: py.Eq, TokenType.STRICT_NOTEQUAL: py.NotEq}
+# These produce True, False or None (after an error), so they need no truthy() as a condition
+BOOLEAN_OPS = set(COMPARISONS) | set(STRICT) | {TokenType.AND, TokenType.OR, TokenType.NOT}
+UNBOUND_LOCAL = re.compile(r"local variable '([^']+)'")
+
+_units = {}
+
+
+def evaluate_python(expr, ctx):
+    runtime = ctx.get("__python__")
+    if runtime is None:
+        runtime = ctx["__python__"] = PythonRuntime(ctx)
+    return runtime.run(expr)
+
+
+def error_message(error):
+    if isinstance(error, UnboundLocalError):
+        match = UNBOUND_LOCAL.search(str(error))
+        if match:
+            return f"Undefined variable '{match.group(1)}'"
+    elif isinstance(error, NameError) and error.name:
+        if error.name.startswith((FN, BODY)):
+            return f"Unknown function '{error.name[3:]}'"
+        return f"Undefined variable '{error.name.removeprefix('v:')}'"
+    return str(error)
+
+
+class PythonRuntime:
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.instances = {}
+        ctx["__builtins__"] = {}
+        self.helpers = (
+            truthy, self.error, self.define, self.arity, MISSING, ctx, BreakSignal, ContinueSignal,
+            BaseLiteral, isinstance, type, str, TypeError, Exception, TailCall,
+            BaseArray, BaseArray.of, self.spawn, self.use,
+        )
+        for fn in list(ctx.setdefault("__functions__", {}).values()):
+            self.bind(fn)
+
+    def run(self, stmt):
+        try:
+            return self.instantiate(*compile_statement(stmt))()
+        except NameError as e:
+            message = error_message(e)
+            if message != str(e):
+                raise NameError(message) from None
+            raise
+
+    def instantiate(self, factory, consts):
+        return FunctionType(factory, self.ctx)(*self.helpers, *consts)
+
+    def bind(self, fn):
+        impl = self.instances.get(fn)
+        if impl is None and fn.native:
+            # Called directly, with no type checks generated in front of it
+            entry = native_entry(fn)
+            impl = self.instances[fn] = (entry, entry)
+        if impl is None:
+            unit = _units.get(fn)
+            if unit is None:
+                unit = _units[fn] = compile_function(fn)
+            impl = self.instantiate(*unit)
+            if fn.pure:
+                impl = (_memoized(fn, impl[0]), impl[1])
+            self.instances[fn] = impl
+        self.ctx[FN + fn.name], self.ctx[BODY + fn.name] = impl
+
+    # Helpers called from generated code
+
+    def define(self, fn):
+        self.ctx["__functions__"][fn.name] = fn
+        self.bind(fn)
+
+    def use(self, name):
+        for fn in plugins.use(name, self.ctx["__functions__"]).values():
+            self.bind(fn)
+
+    def error(self, e, pos):
+        ctx = self.ctx
+        print_error_with_origin(ctx.get("__source__", ""), pos, error_message(e), ctx.get("__filename__", "<input>"))
+        return None
+
+    def spawn(self, name, *args):
+        fn = self.ctx["__functions__"].get(name)
+        if fn is None:
+            raise NameError(f"Unknown function '{name}'")
+        if not fn.native:
+            check_args(fn, args)
+        return spawn_call(fn, args, self.ctx, self.call)
+
+    def call(self, fn, args, ctx):
+        # The first call of a spawned task, through fn:<name> like any call in generated code
+        try:
+            return ctx[FN + fn.name](*args)
+        except NameError as e:
+            message = error_message(e)
+            if message != str(e):
+                raise NameError(message) from None
+            raise
+
+    @staticmethod
+    def arity(name, params, extra):
+        given = sum(1 for value in params if value is not MISSING) + len(extra)
+        return TypeError(f"'{name}' expects {len(params)} argument(s), got {given}")
+
+
+def _memoized(fn, entry):
+    # Wraps the entry point only: a tail call goes straight to the body, like in the other engines
+    def pure(*args):
+        memo = memo_of(fn)
+        value = memo.lookup(args)
+        if value is NOT_CACHED:
+            value = entry(*args)
+            memo.store(args, value)
+        return value
+    return pure
+
+
+def _name(name, store=False):
+    if name in RESERVED:
+        name = "v:" + name
+    return py.Name(id=name, ctx=py.Store() if store else py.Load())
+
+
+def _call(func, *args):
+    return py.Call(func=func if isinstance(func, py.AST) else _name(func), args=list(args), keywords=[])
+
+
+def _assign(name, value):
+    return py.Assign(targets=[_name(name, store=True)], value=value)
+
+
+def _const(value):
+    return py.Constant(value=value)
+
+
+def _arguments(names, defaults=(), vararg=None):
+    return py.arguments(
+        posonlyargs=[], args=[py.arg(arg=name) for name in names], vararg=vararg and py.arg(arg=vararg),
+        kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=list(defaults),
+    )
+
+
+def _def(name, args, body):
+    return py.FunctionDef(name=name, args=args, body=body or [py.Pass()], decorator_list=[], returns=None)
+
+
+def _raise(exc):
+    return py.Raise(exc=exc, cause=None)
+
+
+def _reads(node, names):
+    if isinstance(node, Var):
+        names.add(node.name)
+    elif isinstance(node, (list, tuple)):
+        for item in node:
+            _reads(item, names)
+    elif isinstance(node, (Assign, Return)):
+        _reads(node.value, names)
+    elif isinstance(node, BinOp):
+        _reads(node.left, names)
+        _reads(node.right, names)
+    elif isinstance(node, Call):
+        _reads(node.args, names)
+    elif isinstance(node, Spawn):
+        _reads(node.call.args, names)
+    elif isinstance(node, Interpolation):
+        _reads([part for part in node.parts if not isinstance(part, str)], names)
+    elif isinstance(node, ArrayLiteral):
+        _reads(node.items, names)
+    elif isinstance(node, If):
+        _reads([node.condition, node.then_body, node.else_body or ()], names)
+    elif isinstance(node, While):
+        _reads([node.condition, node.body], names)
+    elif isinstance(node, Loop):
+        _reads(node.body, names)
+    return names
+
+
+def _has_call(node):
+    if isinstance(node, Call):
+        return True
+    if isinstance(node, (list, tuple)):
+        return any(_has_call(item) for item in node)
+    if isinstance(node, (Assign, Return)):
+        return _has_call(node.value)
+    if isinstance(node, BinOp):
+        return _has_call(node.left) or _has_call(node.right)
+    if isinstance(node, Interpolation):
+        return _has_call([part for part in node.parts if not isinstance(part, str)])
+    if isinstance(node, ArrayLiteral):
+        return _has_call(node.items)
+    if isinstance(node, Spawn):
+        # The spawned call runs in another task, so only its arguments count
+        return _has_call(node.call.args)
+    if isinstance(node, If):
+        return _has_call([node.condition, node.then_body, node.else_body or ()])
+    if isinstance(node, While):
+        return _has_call([node.condition, node.body])
+    if isinstance(node, Loop):
+        return _has_call(node.body)
+    return False
+
+
+class _LoopInfo:
+    __slots__ = ("label", "id", "passed")
+
+    def __init__(self, label, id):
+        self.label = label
+        self.id = id
+        self.passed = False   # a labeled jump to an outer loop leaves through this one
+
+
+class Transpiler:
+    # scope is the function's Scope, None for top-level code
+    def __init__(self, stable=(), scope=None):
+        self.scope = scope
+        self.consts = []
+        self.temps = 0
+        self.loops = []
+        self.loop_ids = 0
+        self.uses_jump = False
+        self.stable = set(stable)   # names that are always bound and never change mid-expression
+
+    def const(self, value):
+        for i, existing in enumerate(self.consts):
+            if existing is value:
+                return _name(f"k:{i}")
+        self.consts.append(value)
+        return _name(f"k:{len(self.consts) - 1}")
+
+    def temp(self):
+        self.temps += 1
+        return f"t:{self.temps}"
+
+    # Statements
+
+    def block(self, body):
+        stmts = []
+        for stmt in body:
+            stmts += self.statement(stmt)
+        return stmts
+
+    def statement(self, stmt):
+        if isinstance(stmt, Assign):
+            stmts, value = self.expression(stmt.value)
+            return stmts + [_assign(stmt.name, value)]
+        if isinstance(stmt, Function):
+            return [py.Expr(_call("rt:define", self.const(stmt)))]
+        if isinstance(stmt, Use):
+            return [py.Expr(_call("rt:use", _const(stmt.name)))]
+        if isinstance(stmt, If):
+            stmts, test = self.condition(stmt.condition)
+            then_body = self.block(stmt.then_body) or [py.Pass()]
+            else_body = self.block(stmt.else_body) if stmt.else_body else []
+            return stmts + [py.If(test=test, body=then_body, orelse=else_body)]
+        if isinstance(stmt, (While, Loop)):
+            return self.loop(stmt)
+        if isinstance(stmt, (Break, Continue)):
+            return self.jump(stmt)
+        if isinstance(stmt, Return) and self.scope is not None:
+            if id(stmt) in self.scope.tail_calls:
+                call = stmt.value
+                stmts, args = self.operands(call.args)
+                marker = _call("rt:TailCall", _name(BODY + call.name), py.Tuple(elts=args, ctx=py.Load()))
+                return stmts + [py.Return(value=marker)]
+            stmts, value = self.expression(stmt.value)
+            return stmts + [py.Return(value=value)]
+        stmts, value = self.expression(stmt)
+        return stmts + [py.Expr(value)]
+
+    def loop(self, stmt):
+        self.loop_ids += 1
+        info = _LoopInfo(stmt.label, self.loop_ids)
+        parent = self.loops[-1] if self.loops else None
+
+        self.loops.append(info)
+        body = self.block(stmt.body) or [py.Pass()]
+        self.loops.pop()
+
+        if _has_call(stmt.body):
+            # A break/continue without a loop inside a called function arrives as a signal
+            body = [py.Try(body=body, handlers=[
+                self.signal_handler("rt:Continue", stmt.label, py.Continue()),
+                self.signal_handler("rt:Break", stmt.label, py.Break()),
+            ], orelse=[], finalbody=[])]
+
+        if isinstance(stmt, While):
+            cond_stmts, test = self.condition(stmt.condition)
+            if cond_stmts:
+                body = cond_stmts + [py.If(test=py.UnaryOp(op=py.Not(), operand=test), body=[py.Break()], orelse=[])] + body
+                test = _const(True)
+        else:
+            test = _const(True)
+
+        result = [py.While(test=test, body=body, orelse=[])]
+        if info.passed:
+            result.append(self.forward_jump(parent))
+        return result
+
+    def signal_handler(self, signal, label, action):
+        # except signal as t: if t.label is not None and t.label != label: raise; action
+        name = self.temp()
+        foreign = py.BoolOp(op=py.And(), values=[
+            py.Compare(left=py.Attribute(value=_name(name), attr="label", ctx=py.Load()),
+                       ops=[py.IsNot()], comparators=[_const(None)]),
+            py.Compare(left=py.Attribute(value=_name(name), attr="label", ctx=py.Load()),
+                       ops=[py.NotEq()], comparators=[_const(label)]),
+        ])
+        return py.ExceptHandler(type=_name(signal), name=name, body=[
+            py.If(test=foreign, body=[_raise(None)], orelse=[]), action,
+        ])
+
+    def jump(self, stmt):
+        is_break = isinstance(stmt, Break)
+        if stmt.depth is not None:
+            depth = len(self.loops) - 1 - stmt.depth
+            target = self.loops[depth]
+            if not stmt.depth:
+                return [py.Break() if is_break else py.Continue()]
+            # Leave the inner loops one by one; each checks c:jump after it ends
+            for inner in self.loops[depth + 1:]:
+                inner.passed = True
+            self.uses_jump = True
+            return [_assign("c:jump", _const(target.id * 2 + is_break)), py.Break()]
+
+        signal = "rt:Break" if is_break else "rt:Continue"
+        return [_raise(_call(signal, _const(stmt.label)))]
+
+    def forward_jump(self, parent):
+        # After an inner loop: finish a labeled jump aimed at parent, or keep leaving
+        jump = _name("c:jump")
+        reset = _assign("c:jump", _const(None))
+        return py.If(
+            test=py.Compare(left=jump, ops=[py.IsNot()], comparators=[_const(None)]),
+            body=[
+                py.If(test=py.Compare(left=_name("c:jump"), ops=[py.Eq()], comparators=[_const(parent.id * 2 + 1)]),
+                      body=[reset, py.Break()], orelse=[]),
+                py.If(test=py.Compare(left=_name("c:jump"), ops=[py.Eq()], comparators=[_const(parent.id * 2)]),
+                      body=[reset, py.Continue()], orelse=[]),
+                py.Break(),
+            ],
+            orelse=[],
+        )
+
+    def condition(self, expr):
+        stmts, value = self.expression(expr)
+        if isinstance(expr, BinOp) and expr.op in BOOLEAN_OPS:
+            return stmts, value
+        return stmts, _call("rt:truthy", value)
+
+    # Expressions: each returns (statements to run first, expression for the value)
+
+    def expression(self, expr):
+        if isinstance(expr, Var):
+            return [], _name(expr.name)
+        if isinstance(expr, BinOp):
+            return self.binop(expr)
+        if isinstance(expr, Call):
+            stmts, args = self.operands(expr.args)
+            return stmts, _call(_name(FN + expr.name), *args)
+        if isinstance(expr, Spawn):
+            stmts, args = self.operands(expr.call.args)
+            return stmts, _call("rt:spawn", _const(expr.call.name), *args)
+        if isinstance(expr, Return):
+            return self.expression(expr.value)
+        if isinstance(expr, Text):
+            return [], _const(expr.value)
+        if isinstance(expr, Interpolation):
+            exprs = [part for part in expr.parts if not isinstance(part, str)]
+            stmts, values = self.operands(exprs)
+            values = iter(values)
+            parts = [
+                _const(part) if isinstance(part, str) else py.FormattedValue(value=next(values), conversion=ord("s"))
+                for part in expr.parts
+            ]
+            return stmts, py.JoinedStr(values=parts)
+        if isinstance(expr, ArrayLiteral):
+            stmts, items = self.operands(expr.items)
+            return stmts, _call("rt:array", py.List(elts=items, ctx=py.Load()))
+        if isinstance(expr, BaseLiteral):
+            return [], self.const(expr)
+        if isinstance(expr, (int, str)):
+            return [], _const(expr)
+        if isinstance(expr, (If, While, Loop)):
+            # Used as a value: runs like the statement and evaluates to None
+            return self.statement(expr), _const(None)
+        raise TypeError(f"Unsupported expression type: {expr}")
+
+    def operands(self, exprs):
+        # Keep left-to-right evaluation when a later operand needs statements of its own
+        parts = [self.expression(expr) for expr in exprs]
+        stmts, values = [], []
+        for i, (part_stmts, value) in enumerate(parts):
+            stmts += part_stmts
+            later = any(p[0] for p in parts[i + 1:])
+            if later and not isinstance(value, py.Constant) and not self.is_stable(value):
+                name = self.temp()
+                stmts.append(_assign(name, value))
+                value = _name(name)
+            values.append(value)
+        return stmts, values
+
+    def is_stable(self, value):
+        return isinstance(value, py.Name) and (value.id in self.stable or value.id.startswith(("k:", "t:")))
+
+    def binop(self, expr):
+        op = expr.op
+        result = self.temp()
+        if op in (TokenType.AND, TokenType.OR):
+            left_stmts, left = self.expression(expr.left)
+            right_stmts, right = self.expression(expr.right)
+            test = _name(result) if op == TokenType.AND else py.UnaryOp(op=py.Not(), operand=_name(result))
+            body = left_stmts + [
+                _assign(result, _call("rt:truthy", left)),
+                py.If(test=test, body=right_stmts + [_assign(result, _call("rt:truthy", right))], orelse=[]),
+            ]
+        elif op == TokenType.NOT:
+            stmts, right = self.expression(expr.right)
+            body = stmts + [_assign(result, py.UnaryOp(op=py.Not(), operand=_call("rt:truthy", right)))]
+        else:
+            stmts, (left, right) = self.operands([expr.left, expr.right])
+            if op in ARITHMETIC:
+                value = py.BinOp(left=left, op=ARITHMETIC[op](), right=right)
+            elif op in STRICT:
+                value = py.Compare(left=left, ops=[STRICT[op]()], comparators=[right])
+            elif op in COMPARISONS:
+                as_int = lambda node: _call(py.Attribute(value=node, attr="to_int", ctx=py.Load()))
+                value = py.Compare(left=as_int(left), ops=[COMPARISONS[op]()], comparators=[as_int(right)])
+            else:
+                raise TypeError(f"Unsupported operator: {op}")
+            body = stmts + [_assign(result, value)]
+
+        if expr.pos is None:
+            return body, _name(result)
+        # Like the tree walker: report the error at the operator and continue with None
+        error = self.temp()
+        handler = py.ExceptHandler(type=_name("rt:Exception"), name=error, body=[
+            _assign(result, _call("rt:error", _name(error), _const(expr.pos))),
+        ])
+        return [py.Try(body=body, handlers=[handler], orelse=[], finalbody=[])], _name(result)
+
+
+def _factory(defs, result, consts):
+    # factory(helpers..., constants...) defines functions with all of them as closure cells
+    params = list(HELPERS) + [f"k:{i}" for i in range(len(consts))]
+    factory = _def("factory", _arguments(params), defs + [py.Return(value=result)])
+    module = py.fix_missing_locations(py.Module(body=[factory], type_ignores=[]))
+    code = compile(module, "<mbase>", "exec")
+    factory_code = next(c for c in code.co_consts if hasattr(c, "co_name") and c.co_name == "factory")
+    return factory_code, tuple(consts)
+
+
+def compile_statement(stmt):
+    # Top-level code runs in a function whose assignments are declared global
+    transpiler = Transpiler()
+    if isinstance(stmt, (Assign, Function, Use, If, While, Loop, Break, Continue)):
+        body = transpiler.statement(stmt) + [py.Return(value=_const(None))]
+    else:
+        stmts, value = transpiler.expression(stmt)
+        body = stmts + [py.Return(value=value)]
+    names = sorted(_name(name).id for name in assigned_names([stmt], []))
+    prologue = [py.Global(names=names)] if names else []
+    if transpiler.uses_jump:
+        prologue.append(_assign("c:jump", _const(None)))
+    inner = _def("statement", _arguments([]), prologue + body)
+    return _factory([inner], _name(inner.name), transpiler.consts)
+
+
+def compile_function(fn):
+    params = [name for _, name in fn.args]
+    body = []
+    for stmt in fn.body or ():
+        body.append(stmt)
+        if isinstance(stmt, Return):
+            break
+
+    # Parameters, in order; an earlier duplicate is bound but never visible, as in the tree walker
+    arg_names = [f"p:{i}" if name in params[i + 1:] else _name(name).id for i, name in enumerate(params)]
+    missing = [py.Compare(left=_name(a), ops=[py.Is()], comparators=[_name("rt:missing")]) for a in arg_names]
+    passed = py.Tuple(elts=[_name(a) for a in arg_names], ctx=py.Load())
+    prologue = [py.If(
+        test=py.BoolOp(op=py.Or(), values=missing + [_name("p:extra")]) if missing else _name("p:extra"),
+        body=[_raise(_call("rt:arity", _const(fn.name), passed, _name("p:extra")))],
+        orelse=[],
+    )]
+    for i, ((expected, _), arg) in enumerate(zip(fn.args, arg_names)):
+        prologue += _type_check(i + 1, expected, arg)
+
+    scope = None if fn.builtin else resolve(fn)
+    transpiler = Transpiler([a for a in arg_names if not a.startswith("p:")], scope)
+    if fn.builtin:
+        impl = transpiler.const(fn.impl)
+        statements = [py.Return(value=_call(impl, *[_name(a) for a in arg_names]))]
+    else:
+        statements = transpiler.block(body)
+
+        # A name the function assigns starts as the global of the same name, if there is one
+        local_names = set(assigned_names(body, [])) - set(params)
+        assigned = set(params)
+        copy_in = set()
+        for stmt in body:
+            copy_in |= (_reads(stmt, set()) & local_names) - assigned
+            if isinstance(stmt, Assign):
+                assigned.add(stmt.name)
+        for name in sorted(copy_in):
+            key = _const(_name(name).id)
+            prologue.append(py.If(
+                test=py.Compare(left=key, ops=[py.In()], comparators=[_name("rt:globals")]),
+                body=[_assign(name, py.Subscript(value=_name("rt:globals"), slice=key, ctx=py.Load()))],
+                orelse=[],
+            ))
+        if transpiler.uses_jump:
+            prologue.append(_assign("c:jump", _const(None)))
+
+    args = _arguments(arg_names, [_name("rt:missing")] * len(arg_names), vararg="p:extra")
+    entry = (PURE if fn.pure else FN) + fn.name
+    if scope is None or not scope.tail_calls:
+        inner = _def(entry, args, prologue + statements)
+        return _factory([inner], py.Tuple(elts=[_name(inner.name)] * 2, ctx=py.Load()), transpiler.consts)
+
+    # def fn:f(*p:args): r = tb:f(*p:args); while type(r) is TailCall: r = r.fn(*r.args); return r
+    inner = _def(BODY + fn.name, args, prologue + statements)
+    result = _name("t:result")
+    attribute = lambda name: py.Attribute(value=_name("t:result"), attr=name, ctx=py.Load())
+    star = lambda node: py.Starred(value=node, ctx=py.Load())
+    trampoline = _def(entry, _arguments([], vararg="p:args"), [
+        _assign("t:result", _call(inner.name, star(_name("p:args")))),
+        py.While(
+            test=py.Compare(left=_call("rt:type", result), ops=[py.Is()], comparators=[_name("rt:TailCall")]),
+            body=[_assign("t:result", _call(attribute("fn"), star(attribute("args"))))],
+            orelse=[],
+        ),
+        py.Return(value=_name("t:result")),
+    ])
+    return _factory([inner, trampoline], py.Tuple(elts=[_name(trampoline.name), _name(inner.name)], ctx=py.Load()),
+                    transpiler.consts)
+
+
+def _type_check(index, expected, arg):
+    value = _name(arg)
+
+    def fail(message):
+        return _raise(_call("rt:TypeError", message))
+
+    if expected.startswith("b"):
+        checks = [py.If(
+            test=py.UnaryOp(op=py.Not(), operand=_call("rt:isinstance", value, _name("rt:BaseLiteral"))),
+            body=[fail(_const(f"Argument {index} must be BaseLiteral"))], orelse=[],
+        )]
+        if expected != "b_":
+            base = py.Attribute(value=_name(arg), attr="base", ctx=py.Load())
+            checks.append(py.If(
+                test=py.Compare(left=base, ops=[py.NotEq()], comparators=[_const(int(expected[1:]))]),
+                body=[fail(py.JoinedStr(values=[
+                    _const(f"Argument {index} must be base {expected[1:]}, got base "),
+                    py.FormattedValue(value=py.Attribute(value=_name(arg), attr="base", ctx=py.Load()), conversion=-1),
+                ]))], orelse=[],
+            ))
+        return checks
+    if expected == "arr":
+        return [py.If(
+            test=py.UnaryOp(op=py.Not(), operand=_call("rt:isinstance", value, _name("rt:BaseArray"))),
+            body=[fail(py.JoinedStr(values=[
+                _const(f"Argument {index} must be arr, got "),
+                py.FormattedValue(value=py.Attribute(
+                    value=_call("rt:type", _name(arg)), attr="__name__", ctx=py.Load()), conversion=-1),
+            ]))], orelse=[],
+        )]
+    if expected == "any":
+        return []
+    if expected == "str":
+        return [py.If(
+            test=py.UnaryOp(op=py.Not(), operand=_call("rt:isinstance", value, _name("rt:str"))),
+            body=[fail(py.JoinedStr(values=[
+                _const(f"Argument {index} must be str, got "),
+                py.FormattedValue(value=py.Attribute(
+                    value=_call("rt:type", _name(arg)), attr="__name__", ctx=py.Load()), conversion=-1),
+            ]))], orelse=[],
+        )]
+    return [fail(_const(f"Unknown expected type '{expected}'"))]
@@ -0,0 +1,236 @@
+from Interpreter.bytecode import *
+from Interpreter.runtime import (
+    NOT_CACHED, BreakSignal, ContinueSignal, call_memoized, check_args, memo_of, spawn_call, truthy,
+)
+from Interpreter.scope import UNBOUND
+from Mbase import plugins
+from Mbase.array import BaseArray
+from Mbase.error import print_error_with_origin
+
+# Stack-based virtual machine for Interpreter/bytecode.py. Calls push a Frame instead of
+# recursing in Python; errors and break/continue signals unwind through the handler tables.
+
+_codes = {}
+
+
+class Frame:
+    # parent is the frame to return to; a call into a pure function stores its result in memo
+    # under key when it returns
+    __slots__ = ("code", "slots", "stack", "ip", "parent", "memo", "key")
+
+    def __init__(self, code, slots, parent, memo=None, key=None):
+        self.code = code
+        self.slots = slots
+        self.stack = []
+        self.ip = 0
+        self.parent = parent
+        self.memo = memo
+        self.key = key
+
+
+def evaluate_vm(expr, ctx):
+    return run(compile_statement(expr), ctx)
+
+
+def function_code(fn):
+    code = _codes.get(fn)
+    if code is None:
+        code = _codes[fn] = compile_function(fn)
+    return code
+
+
+def call_function(fn, args, ctx):
+    # Runs fn to the end in a run() of its own, as the first call of a spawned task
+    if fn.pure:
+        return call_memoized(fn, args, ctx, run_function)
+    return run_function(fn, args, ctx)
+
+
+def run_function(fn, args, ctx):
+    code = function_code(fn)
+    slots = [UNBOUND] * len(code.varnames)
+    for index, value in zip(code.param_slots, args):
+        slots[index] = value
+    return run(code, ctx, slots)
+
+
+def find_handler(frame, error):
+    at = frame.ip - 2
+    is_signal = isinstance(error, (BreakSignal, ContinueSignal))
+    for start, end, kind, depth, a, b, label in frame.code.handlers:
+        if not start <= at < end:
+            continue
+        if kind == HANDLER_ERROR:
+            return kind, depth, a, b
+        if is_signal and (error.label is None or error.label == label):
+            return kind, depth, a if isinstance(error, BreakSignal) else b, None
+    return None
+
+
+def run(code, ctx, slots=None):
+    functions = ctx.setdefault("__functions__", {})
+    binary_ops = BINARY_OPS
+
+    frame = Frame(code, [] if slots is None else slots, None)
+    ops, consts, names, slots, stack, ip = code.ops, code.consts, code.names, frame.slots, frame.stack, 0
+
+    while True:
+        try:
+            while True:
+                op = ops[ip]
+                arg = ops[ip + 1]
+                ip += 2
+
+                if op == LOAD_FAST:
+                    value = slots[arg]
+                    if value is UNBOUND:
+                        name = frame.code.varnames[arg]
+                        try:
+                            value = ctx[name]
+                        except KeyError:
+                            raise NameError(f"Undefined variable '{name}'") from None
+                    stack.append(value)
+                elif op == LOAD_CONST:
+                    stack.append(consts[arg])
+                elif op == BINARY:
+                    right = stack.pop()
+                    stack[-1] = binary_ops[arg](stack[-1], right)
+                elif op == STORE_FAST:
+                    slots[arg] = stack.pop()
+                elif op == POP_JUMP_IF_FALSE:
+                    if not truthy(stack.pop()):
+                        ip += arg
+                elif op == JUMP:
+                    ip += arg
+                elif op == LOAD_GLOBAL:
+                    name = names[arg]
+                    try:
+                        stack.append(ctx[name])
+                    except KeyError:
+                        raise NameError(f"Undefined variable '{name}'") from None
+                elif op == STORE_GLOBAL:
+                    ctx[names[arg]] = stack.pop()
+                elif op == POP:
+                    stack.pop()
+                elif op == CALL or op == TAIL_CALL:
+                    name, argc = consts[arg]
+                    if argc:
+                        args = stack[-argc:]
+                        del stack[-argc:]
+                    else:
+                        args = []
+                    fn = functions.get(name)
+                    if fn is None:
+                        raise NameError(f"Unknown function '{name}'")
+                    if not fn.native:
+                        check_args(fn, args)
+                    if fn.builtin:
+                        try:
+                            stack.append(fn.impl(*args))
+                        except (TypeError, AttributeError):
+                            # A native function's arguments are only checked once it has failed
+                            if fn.native:
+                                check_args(fn, args)
+                            raise
+                        continue
+
+                    memo = key = None
+                    if op == TAIL_CALL:
+                        # The replacing call finishes the replaced one, memoized or not
+                        memo, key = frame.memo, frame.key
+                    elif fn.pure:
+                        memo = memo_of(fn)
+                        key = tuple(args)
+                        value = memo.lookup(key)
+                        if value is not NOT_CACHED:
+                            stack.append(value)
+                            continue
+
+                    callee = function_code(fn)
+                    new_slots = [UNBOUND] * len(callee.varnames)
+                    for index, value in zip(callee.param_slots, args):
+                        new_slots[index] = value
+                    if op == TAIL_CALL:
+                        frame = Frame(callee, new_slots, frame.parent, memo, key)
+                    else:
+                        frame.ip = ip
+                        frame = Frame(callee, new_slots, frame, memo, key)
+                    ops, consts, names, slots, stack, ip = callee.ops, callee.consts, callee.names, new_slots, frame.stack, 0
+                elif op == RETURN_VALUE:
+                    value = stack.pop()
+                    if frame.memo is not None:
+                        frame.memo.store(frame.key, value)
+                    frame = frame.parent
+                    if frame is None:
+                        return value
+                    code = frame.code
+                    ops, consts, names, slots, stack, ip = code.ops, code.consts, code.names, frame.slots, frame.stack, frame.ip
+                    stack.append(value)
+                elif op == JUMP_IF_FALSE_OR_POP:
+                    if stack[-1]:
+                        stack.pop()
+                    else:
+                        ip += arg
+                elif op == JUMP_IF_TRUE_OR_POP:
+                    if stack[-1]:
+                        ip += arg
+                    else:
+                        stack.pop()
+                elif op == TRUTHY:
+                    stack[-1] = truthy(stack[-1])
+                elif op == NOT:
+                    stack[-1] = not truthy(stack[-1])
+                elif op == TO_STR:
+                    stack[-1] = str(stack[-1])
+                elif op == BUILD_STRING:
+                    parts = stack[-arg:]
+                    del stack[-arg:]
+                    stack.append("".join(parts))
+                elif op == SPAWN:
+                    name, argc = consts[arg]
+                    if argc:
+                        args = stack[-argc:]
+                        del stack[-argc:]
+                    else:
+                        args = []
+                    fn = functions.get(name)
+                    if fn is None:
+                        raise NameError(f"Unknown function '{name}'")
+                    if not fn.native:
+                        check_args(fn, args)
+                    stack.append(spawn_call(fn, args, ctx, call_function))
+                elif op == BUILD_ARRAY:
+                    items = stack[len(stack) - arg:]
+                    del stack[len(stack) - arg:]
+                    stack.append(BaseArray.of(items))
+                elif op == DEFINE_FUNCTION:
+                    fn = consts[arg]
+                    functions[fn.name] = fn
+                elif op == USE:
+                    plugins.use(consts[arg], functions)
+                elif op == RAISE_SIGNAL:
+                    is_break, label = consts[arg]
+                    raise BreakSignal(label) if is_break else ContinueSignal(label)
+                else:
+                    raise SystemError(f"Bad opcode {op}")
+
+        except Exception as error:
+            # Unwind to the innermost handler, popping frames that have none
+            frame.ip = ip
+            while True:
+                handler = find_handler(frame, error)
+                if handler is not None:
+                    break
+                frame = frame.parent
+                if frame is None:
+                    raise
+
+            kind, depth, target, pos = handler
+            code = frame.code
+            ops, consts, names, slots, stack, ip = code.ops, code.consts, code.names, frame.slots, frame.stack, target
+            del stack[depth:]
+            if kind == HANDLER_ERROR:
+                print_error_with_origin(
+                    ctx.get("__source__", ""), pos, str(error), ctx.get("__filename__", "<input>")
+                )
+                stack.append(None)
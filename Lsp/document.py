@@ -0,0 +1,236 @@
+from bisect import bisect_left, bisect_right
+
+from Mbase.ast import Assign
+from Mbase.error import PositionedSyntaxError
+from Mbase.types import Function
+from Parser.parse import Parser
+from Parser.token_type import TokenType
+from Parser.tokenizer import tokenize
+
+SEPARATORS = (TokenType.NEWLINE, TokenType.SEMICOLON)
+BRACES = {TokenType.LBRACE: 1, TokenType.RBRACE: -1}
+
+
+def _start(segment):
+    return segment.start
+
+
+class Segment:
+    # One top-level statement. It spans from its first token to the next token after it;
+    # token and error positions are as lexed, shift maps them into the current text.
+    __slots__ = ("start", "end", "tokens", "node", "errors", "shift")
+
+    def __init__(self, start, end, tokens, node, errors):
+        self.start = start
+        self.end = end
+        self.tokens = tokens
+        self.node = node
+        self.errors = errors
+        self.shift = 0
+
+    def move(self, delta):
+        self.start += delta
+        self.end += delta
+        self.shift += delta
+
+    def name_token(self):
+        if isinstance(self.node, Function):
+            # fn <name>, or pure fn <name>
+            return self.tokens[2 if self.node.pure else 1]
+        if isinstance(self.node, Assign):
+            return self.tokens[0]
+        return None
+
+
+class _Recorder:
+    # Hands tokens to the parser, remembers every one of them and lexes past bad characters
+    def __init__(self, text, start):
+        self.text = text
+        self.tokens = []
+        self.errors = []
+        self.lexer = tokenize(text, start)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            try:
+                tok = next(self.lexer)
+            except PositionedSyntaxError as e:
+                self.errors.append((e.pos, str(e)))
+                self.lexer = tokenize(self.text, e.pos + 1)
+                continue
+            self.tokens.append(tok)
+            return tok
+
+
+class Document:
+    def __init__(self, uri, text):
+        self.uri = uri
+        self.reset(text)
+
+    def reset(self, text):
+        self.text = text
+        self.line_starts = [0] + [i + 1 for i, ch in enumerate(text) if ch == "\n"]
+        self.segments, _ = self._parse_from(0, [], 0, 0, 0)
+
+    def apply_change(self, new_text, start=None, end=None):
+        if start is None:
+            self.reset(new_text)
+            return
+
+        self.text = self.text[:start] + new_text + self.text[end:]
+        delta = len(new_text) - (end - start)
+        self._update_lines(start, end, new_text, delta)
+
+        # The statement before the edited one is re-parsed too, its end depends on lookahead
+        old = self.segments
+        first = bisect_right(old, start, key=_start) - 2
+        if first < 0:
+            first, parse_start = 0, 0
+        else:
+            parse_start = old[first].start
+        fresh, resume = self._parse_from(parse_start, old, start + len(new_text), delta, first + 1)
+
+        for segment in old[resume:]:
+            segment.move(delta)
+        self.segments = old[:first] + fresh + old[resume:]
+
+    def _parse_from(self, start, old, resync_after, delta, lo):
+        # Parse top-level statements from start until one begins where an unchanged old one did
+        recorder = _Recorder(self.text, start)
+        parser = Parser(recorder, self.text)
+        segments = []
+        while True:
+            tok = parser.current()
+            if tok.type == TokenType.EOF:
+                self._attach_errors(recorder, segments, len(self.text))
+                return segments, len(old)
+            if tok.type in SEPARATORS:
+                parser.advance()
+                continue
+
+            self._attach_errors(recorder, segments, tok.pos)
+            if tok.pos >= resync_after:
+                k = bisect_left(old, tok.pos - delta, lo=lo, key=_start)
+                if k < len(old) and old[k].start == tok.pos - delta:
+                    return segments, k
+
+            first = parser.pos
+            try:
+                node = parser.parse_top_level()
+                errors = []
+            except (SyntaxError, ValueError) as e:
+                node = None
+                pos = e.pos if isinstance(e, PositionedSyntaxError) else parser.current().pos
+                errors = [(pos if pos is not None else len(self.text), str(e))]
+                self._recover(parser, recorder.tokens, first)
+
+            after = parser.current().pos
+            end = after if after is not None else len(self.text)
+            segments.append(Segment(tok.pos, end, recorder.tokens[first:parser.pos], node, errors))
+
+    @staticmethod
+    def _attach_errors(recorder, segments, end):
+        # Lexer errors belong to the statement they follow, or to a segment of their own
+        if not recorder.errors:
+            return
+        errors = [error for error in recorder.errors if error[0] < end]
+        del recorder.errors[:len(errors)]
+        if not errors:
+            return
+        if segments:
+            segments[-1].errors.extend(errors)
+        else:
+            segments.append(Segment(errors[0][0], end, [], None, errors))
+
+    @staticmethod
+    def _recover(parser, tokens, first):
+        # Skip to the next separator outside of any block opened by the broken statement
+        depth = sum(BRACES.get(t.type, 0) for t in tokens[first:parser.pos])
+        while True:
+            tok = parser.current()
+            if tok.type == TokenType.EOF:
+                return
+            parser.advance()
+            if tok.type in SEPARATORS and depth <= 0:
+                return
+            depth += BRACES.get(tok.type, 0)
+
+    def _update_lines(self, start, end, new_text, delta):
+        lo = bisect_right(self.line_starts, start)
+        hi = bisect_right(self.line_starts, end)
+        inserted = [start + i + 1 for i, ch in enumerate(new_text) if ch == "\n"]
+        self.line_starts[lo:] = inserted + [pos + delta for pos in self.line_starts[hi:]]
+
+    # Positions: LSP lines/characters count UTF-16 code units
+
+    def offset_at(self, line, character):
+        if line >= len(self.line_starts):
+            return len(self.text)
+        start = self.line_starts[line]
+        end = self.line_starts[line + 1] - 1 if line + 1 < len(self.line_starts) else len(self.text)
+        text = self.text[start:end]
+        if not text.isascii():
+            units = 0
+            for i, ch in enumerate(text):
+                if units >= character:
+                    return start + i
+                units += 2 if ord(ch) > 0xFFFF else 1
+            return end
+        return start + min(character, len(text))
+
+    def position_at(self, offset):
+        line = bisect_right(self.line_starts, offset) - 1
+        start = self.line_starts[line]
+        prefix = self.text[start:offset]
+        character = len(prefix)
+        if not prefix.isascii():
+            character += sum(1 for ch in prefix if ord(ch) > 0xFFFF)
+        return {"line": line, "character": character}
+
+    def range_of(self, start, end):
+        return {"start": self.position_at(start), "end": self.position_at(end)}
+
+    # Queries
+
+    def diagnostics(self):
+        result = []
+        for segment in self.segments:
+            for pos, message in segment.errors:
+                pos = min(pos + segment.shift, len(self.text))
+                result.append((pos, message))
+        return result
+
+    def symbols(self):
+        result = []
+        for segment in self.segments:
+            name_tok = segment.name_token()
+            if name_tok is None:
+                continue
+            name_pos = name_tok.pos + segment.shift
+            stop = segment.start + len(self.text[segment.start:segment.end].rstrip())
+            result.append((segment.node, segment.start, stop, name_pos, name_pos + len(name_tok.value)))
+        return result
+
+    def token_at(self, offset):
+        index = bisect_right(self.segments, offset, key=_start) - 1
+        if index < 0:
+            return None
+        segment = self.segments[index]
+        for tok in segment.tokens:
+            pos = tok.pos + segment.shift
+            if tok.type == TokenType.IDENTIFIER and pos <= offset <= pos + len(tok.value):
+                return tok
+            if pos > offset:
+                break
+        return None
+
+    def function_definition(self, name):
+        for segment in self.segments:
+            if isinstance(segment.node, Function) and segment.node.name == name:
+                name_tok = segment.name_token()
+                pos = name_tok.pos + segment.shift
+                return pos, pos + len(name_tok.value)
+        return None
@@ -0,0 +1,183 @@
+import json
+import sys
+import traceback
+
+from Lsp.document import Document
+from Mbase import config
+from Mbase.ast import Assign
+
+# LSP constants
+SYNC_INCREMENTAL = 2
+SEVERITY_ERROR = 1
+SYMBOL_FUNCTION = 12
+SYMBOL_VARIABLE = 13
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+
+class LanguageServer:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.documents = {}
+        self.shutdown_requested = False
+        self.handlers = {
+            "initialize": self.initialize,
+            "initialized": lambda params: None,
+            "shutdown": self.shutdown,
+            "exit": self.exit,
+            "textDocument/didOpen": self.did_open,
+            "textDocument/didChange": self.did_change,
+            "textDocument/didClose": self.did_close,
+            "textDocument/definition": self.definition,
+            "textDocument/documentSymbol": self.document_symbol,
+        }
+
+    # Transport: JSON-RPC messages framed by a Content-Length header
+
+    def read_message(self):
+        length = None
+        while True:
+            line = self.reader.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode("ascii").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        if length is None:
+            return None
+        return json.loads(self.reader.read(length).decode("utf-8"))
+
+    def send(self, message):
+        body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+        self.writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+        self.writer.flush()
+
+    def notify(self, method, params):
+        self.send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def serve(self):
+        while True:
+            message = self.read_message()
+            if message is None:
+                return 0 if self.shutdown_requested else 1
+            method = message.get("method")
+            handler = self.handlers.get(method)
+            is_request = "id" in message
+
+            if handler is None:
+                if is_request:
+                    self.send({"jsonrpc": "2.0", "id": message["id"],
+                               "error": {"code": METHOD_NOT_FOUND, "message": f"Unknown method '{method}'"}})
+                continue
+
+            try:
+                result = handler(message.get("params"))
+            except SystemExit:
+                raise
+            except Exception as e:
+                traceback.print_exc(file=sys.stderr)
+                if is_request:
+                    self.send({"jsonrpc": "2.0", "id": message["id"],
+                               "error": {"code": INTERNAL_ERROR, "message": str(e)}})
+                continue
+
+            if is_request:
+                self.send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+    # Lifecycle
+
+    def initialize(self, params):
+        cfg = config.get_config()
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": SYNC_INCREMENTAL},
+                "definitionProvider": True,
+                "documentSymbolProvider": True,
+            },
+            "serverInfo": {"name": cfg.app_name, "version": cfg.version},
+        }
+
+    def shutdown(self, params):
+        self.shutdown_requested = True
+        return None
+
+    def exit(self, params):
+        raise SystemExit(0 if self.shutdown_requested else 1)
+
+    # Document sync
+
+    def did_open(self, params):
+        item = params["textDocument"]
+        doc = Document(item["uri"], item["text"])
+        self.documents[doc.uri] = doc
+        self.publish_diagnostics(doc)
+
+    def did_change(self, params):
+        doc = self.documents[params["textDocument"]["uri"]]
+        for change in params["contentChanges"]:
+            if "range" not in change:
+                doc.apply_change(change["text"])
+                continue
+            start = change["range"]["start"]
+            end = change["range"]["end"]
+            doc.apply_change(
+                change["text"],
+                doc.offset_at(start["line"], start["character"]),
+                doc.offset_at(end["line"], end["character"]),
+            )
+        self.publish_diagnostics(doc)
+
+    def did_close(self, params):
+        uri = params["textDocument"]["uri"]
+        self.documents.pop(uri, None)
+        self.notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+
+    def publish_diagnostics(self, doc):
+        diagnostics = [
+            {
+                "range": doc.range_of(pos, min(pos + 1, len(doc.text))),
+                "severity": SEVERITY_ERROR,
+                "source": config.get_config().app_name,
+                "message": message,
+            }
+            for pos, message in doc.diagnostics()
+        ]
+        self.notify("textDocument/publishDiagnostics", {"uri": doc.uri, "diagnostics": diagnostics})
+
+    # Language features
+
+    def definition(self, params):
+        doc = self.documents[params["textDocument"]["uri"]]
+        position = params["position"]
+        tok = doc.token_at(doc.offset_at(position["line"], position["character"]))
+        if tok is None:
+            return None
+        target = doc.function_definition(tok.value)
+        if target is None:
+            return None
+        return {"uri": doc.uri, "range": doc.range_of(*target)}
+
+    def document_symbol(self, params):
+        doc = self.documents[params["textDocument"]["uri"]]
+        symbols = []
+        for node, start, stop, name_start, name_end in doc.symbols():
+            is_assign = isinstance(node, Assign)
+            symbols.append({
+                "name": node.name,
+                "detail": "" if is_assign else node.signature(),
+                "kind": SYMBOL_VARIABLE if is_assign else SYMBOL_FUNCTION,
+                "range": doc.range_of(start, stop),
+                "selectionRange": doc.range_of(name_start, name_end),
+            })
+        return symbols
+
+
+def serve():
+    # stdout carries the protocol; anything the interpreter prints goes to stderr instead
+    writer = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    return LanguageServer(sys.stdin.buffer, writer).serve()
@@ -0,0 +1,197 @@
+import operator
+
+from Mbase.digits import BASE_DIGITS, LEAF_DIGITS, parse_digits
+from Mbase.types import BaseLiteral
+
+# Arrays of base-aware numbers. Values sit in one NumPy int64 buffer, so arithmetic on a whole
+# array is a single NumPy call; an array whose values outgrow int64 switches to an object
+# buffer of Python ints. Without NumPy the values are a tuple of ints. Arrays are immutable.
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INT64_MAX = 2 ** 63 - 1
+
+
+def _store(values):
+    if numpy is None:
+        return tuple(values)
+    try:
+        buffer = numpy.array(values, dtype=numpy.int64)
+    except OverflowError:
+        buffer = numpy.array(values, dtype=object)
+    buffer.flags.writeable = False
+    return buffer
+
+
+def _top(operand):
+    # Largest value of an operand, as a Python int
+    if isinstance(operand, int):
+        return operand
+    if not len(operand):
+        return 0
+    return max(operand) if numpy is None else int(operand.max())
+
+
+def _array(base, values):
+    if base > 36:
+        # Uppercase digits fold to lowercase after arithmetic, as they do for a BaseLiteral
+        values = _store([BaseLiteral.from_int(base, int(value)).value for value in values])
+    return BaseArray(base, values)
+
+
+def _apply(func, left, right):
+    # left and right are buffers of the same length, or one of them is an int
+    if numpy is None:
+        if isinstance(left, int):
+            result = tuple(func(left, value) for value in right)
+        elif isinstance(right, int):
+            result = tuple(func(value, right) for value in left)
+        else:
+            result = tuple(map(func, left, right))
+        if func is operator.sub and min(result, default=0) < 0:
+            raise ValueError("BaseLiteral cannot represent negative values")
+        return result
+
+    if func is operator.floordiv and not (right if isinstance(right, int) else right.all()):
+        raise ZeroDivisionError("integer division or modulo by zero")
+    # Results that may not fit in int64 are computed on Python ints
+    bound = func(_top(left), _top(right)) if func is operator.add or func is operator.mul else 0
+    if max(bound, _top(left), _top(right)) > INT64_MAX:
+        left = left if isinstance(left, int) else left.astype(object)
+        right = right if isinstance(right, int) else right.astype(object)
+    result = func(left, right)
+    if func is operator.sub and (result < 0).any():
+        raise ValueError("BaseLiteral cannot represent negative values")
+    result.flags.writeable = False
+    return result
+
+
+class BaseArray:
+    # Arithmetic with a BaseLiteral broadcasts it over every element
+    __slots__ = ("base", "values")
+    broadcasts = True
+
+    def __init__(self, base, values):
+        self.base = base
+        self.values = values
+
+    @classmethod
+    def of(cls, items):
+        # An array literal: its base is the base of the first element
+        values = []
+        for i, item in enumerate(items):
+            if not isinstance(item, BaseLiteral):
+                raise TypeError(f"Array element {i + 1} must be BaseLiteral, got {type(item).__name__}")
+            values.append(item.value)
+        return _array(items[0].base if items else 10, _store(values))
+
+    @classmethod
+    def parse(cls, base, lines):
+        # One number per line, written like the argument of number()
+        allowed = BASE_DIGITS[base]
+        if (base <= 36 and all(lines) and allowed.issuperset("".join(lines).lower())
+                and max(map(len, lines), default=0) <= LEAF_DIGITS):
+            # Short lines that int() reads exactly as a BaseLiteral would
+            return _array(base, _store([int(line, base) for line in lines]))
+        values = []
+        for line in lines:
+            raw = line.lower()
+            if not allowed.issuperset(raw):
+                BaseLiteral(base, raw)
+            values.append(parse_digits(base, raw))
+        return _array(base, _store(values))
+
+    @classmethod
+    def range(cls, count):
+        if numpy is not None and count.value <= INT64_MAX:
+            values = numpy.arange(count.value, dtype=numpy.int64)
+            values.flags.writeable = False
+        else:
+            values = _store(range(count.value))
+        return _array(count.base, values)
+
+    def _operand(self, other):
+        if isinstance(other, BaseArray):
+            if len(other) != len(self):
+                raise ValueError(f"Array lengths differ: {len(self)} and {len(other)}")
+            return other.values
+        if isinstance(other, BaseLiteral):
+            return other.value
+        if isinstance(other, int):
+            return other
+        raise TypeError(f"Cannot operate with {type(other).__name__}")
+
+    def _binary(self, func, other):
+        return _array(self.base, _apply(func, self.values, self._operand(other)))
+
+    def _reflected(self, func, other):
+        # other is a BaseLiteral, which decides the base like the left operand always does
+        base = other.base if isinstance(other, BaseLiteral) else self.base
+        return _array(base, _apply(func, self._operand(other), self.values))
+
+    def __add__(self, other):
+        return self._binary(operator.add, other)
+
+    def __sub__(self, other):
+        return self._binary(operator.sub, other)
+
+    def __mul__(self, other):
+        return self._binary(operator.mul, other)
+
+    def __truediv__(self, other):
+        return self._binary(operator.floordiv, other)
+
+    def __radd__(self, other):
+        return self._reflected(operator.add, other)
+
+    def __rsub__(self, other):
+        return self._reflected(operator.sub, other)
+
+    def __rmul__(self, other):
+        return self._reflected(operator.mul, other)
+
+    def __rtruediv__(self, other):
+        return self._reflected(operator.floordiv, other)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        base = self.base
+        return (BaseLiteral.from_int(base, int(value)) for value in self.values)
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, BaseArray) or self.base != other.base or len(self) != len(other):
+            return False
+        if numpy is None:
+            return self.values == other.values
+        return bool(numpy.array_equal(self.values, other.values))
+
+    def __hash__(self):
+        return hash((self.base, tuple(int(value) for value in self.values)))
+
+    def __repr__(self):
+        return f"BaseArray({self.base}, {[int(value) for value in self.values]})"
+
+    def __str__(self):
+        return "[" + ", ".join(str(item) for item in self) + "]"
+
+    def at(self, index):
+        i = index.value
+        if i >= len(self):
+            raise IndexError(f"Index {i} out of range for array of length {len(self)}")
+        return BaseLiteral.from_int(self.base, int(self.values[i]))
+
+    def sum(self):
+        values = self.values
+        if numpy is not None and values.dtype != object and _top(values) * len(values) > INT64_MAX:
+            values = values.astype(object)
+        return BaseLiteral.from_int(self.base, int(sum(values) if numpy is None else values.sum()))
+
+    def rebase(self, target_base):
+        return _array(target_base, self.values)
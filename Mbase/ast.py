@@ -1,64 +1,82 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Union
 from Parser.token_type import TokenType
 
 class Node:
-    pass
+    __slots__ = ()
 
-@dataclass
+@dataclass(slots=True)
 class Var(Node):
     name: str
 
-@dataclass
+@dataclass(slots=True)
 class Assign(Node):
     name: str
     value: Node
 
-@dataclass
+@dataclass(slots=True)
 class BinOp(Node):
     op: TokenType
     left: Node
     right: Node
     pos: int
 
-@dataclass
+@dataclass(slots=True)
 class Call(Node):
     name: str
     args: List[Node]
     pos: int
 
-@dataclass
+@dataclass(slots=True)
+class Spawn(Node):
+    call: Call
+
+@dataclass(slots=True)
+class Use(Node):
+    name: str
+
+@dataclass(slots=True)
 class Return(Node):
     value: Node
     pos: int
 
-@dataclass
+@dataclass(slots=True)
 class Text(Node):
     value: str
 
-@dataclass
+@dataclass(slots=True)
+class Interpolation(Node):
+    parts: List[Union[str, Node]]
+
+@dataclass(slots=True)
+class ArrayLiteral(Node):
+    items: List[Node]
+
+@dataclass(slots=True)
 class If(Node):
     label: Optional[str]
     condition: Node
     then_body: List[Node]
     else_body: Optional[List[Node]]
 
-@dataclass
+@dataclass(slots=True)
 class While(Node):
     label: Optional[str]
     condition: Node
     body: List[Node]
 
-@dataclass
+@dataclass(slots=True)
 class Loop(Node):
     label: Optional[str]
     body: List[Node]
 
-@dataclass
+@dataclass(slots=True)
 class Break(Node):
     label: Optional[str]
+    depth: Optional[int] = None
 
-@dataclass
+@dataclass(slots=True)
 class Continue(Node):
     label: Optional[str]
+    depth: Optional[int] = None
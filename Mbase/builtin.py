@@ -1,22 +1,50 @@
+import math
+
+from Mbase import output, tasks
+from Mbase.clock import get_clock
+from Mbase.reader import get_reader
+from Mbase.array import BaseArray
+from Mbase.mathlib import is_prime
 from Mbase.types import BaseLiteral, Function
-import time
 
 def builtin_out(value: str):
-    print(value, end="")
+    output.write(value)
+    tasks.switch()
 
 def builtin_in() -> str:
-    return input()
+    output.flush()
+    return tasks.blocking(get_reader().read_line)
+
+def builtin_eof():
+    return BaseLiteral.from_int(10, int(tasks.blocking(get_reader().at_end)))
+
+def builtin_in_all() -> str:
+    output.flush()
+    return tasks.blocking(get_reader().read_all)
+
+def builtin_in_values(count: BaseLiteral):
+    output.flush()
+    reader = get_reader()
+    lines = tasks.blocking(lambda: reader.read_lines(count.value))
+    return BaseArray.parse(count.base, lines)
 
 def builtin_wait(n):
     if isinstance(n, BaseLiteral):
         n = n.to_int()
-    time.sleep(n)
+    if not get_clock().virtual:
+        output.flush()
+    tasks.sleep(n)
+
+def builtin_now():
+    return BaseLiteral.from_int(10, get_clock().millis())
 
 def builtin_len(value):
-    return BaseLiteral(10, str(len(value)))
+    if not isinstance(value, (str, BaseArray)):
+        raise TypeError(f"Argument 1 must be str or arr, got {type(value).__name__}")
+    return BaseLiteral.from_int(10, len(value))
 
 def builtin_num_len(value):
-    return BaseLiteral(10, str(len(value.raw)))
+    return BaseLiteral.from_int(10, len(value.raw))
 
 def builtin_str(value):
     return str(value)
@@ -29,23 +57,45 @@ def builtin_padstr(value, length):
     return value.zfill(l)
 
 def builtin_sqrt(value: BaseLiteral):
-    val = value.to_int()
-    result = int(val ** 0.5)
-    return BaseLiteral.from_int(value.base, result)
+    return BaseLiteral.from_int(value.base, math.isqrt(value.value))
+
+def builtin_mod(value: BaseLiteral, divisor: BaseLiteral):
+    if divisor.value == 0:
+        raise ZeroDivisionError("mod: division by zero")
+    return BaseLiteral.from_int(value.base, value.value % divisor.value)
+
+def builtin_pow(value: BaseLiteral, exponent: BaseLiteral, modulus: BaseLiteral):
+    if modulus.value == 0:
+        raise ValueError("pow: modulus must not be 0")
+    return BaseLiteral.from_int(value.base, pow(value.value, exponent.value, modulus.value))
+
+def builtin_gcd(a: BaseLiteral, b: BaseLiteral):
+    return BaseLiteral.from_int(a.base, math.gcd(a.value, b.value))
+
+def builtin_is_prime(value: BaseLiteral):
+    return BaseLiteral.from_int(value.base, int(is_prime(value.value)))
+
+def builtin_factorial(value: BaseLiteral):
+    return BaseLiteral.from_int(value.base, math.factorial(value.value))
 
 def builtin_number(value: str, base=10):
-    return BaseLiteral(base, value)
+    return BaseLiteral.parse(base, value)
 
-def builtin_rebase(value: BaseLiteral, new_base: BaseLiteral):
+def target_base(name, new_base: BaseLiteral):
     try:
         base_int = new_base.to_int()
     except ValueError:
-        raise ValueError(f"rebase: invalid base value '{new_base.raw}'")
+        raise ValueError(f"{name}: invalid base value '{new_base.raw}'")
 
     if base_int < 2 or base_int > 64:
-        raise ValueError(f"rebase: target base must be between 2 and 64, got {base_int}")
+        raise ValueError(f"{name}: target base must be between 2 and 64, got {base_int}")
+    return base_int
+
+def builtin_rebase(value: BaseLiteral, new_base: BaseLiteral):
+    return value.rebase(target_base("rebase", new_base))
 
-    return value.rebase(base_int)
+def builtin_rebase_all(values: BaseArray, new_base: BaseLiteral):
+    return values.rebase(target_base("rebase_all", new_base))
 
 BUILTINS = {
     "out": Function(
@@ -62,6 +112,27 @@ BUILTINS = {
         builtin=True,
         impl=builtin_in
     ),
+    "eof": Function(
+        name="eof",
+        args=[],
+        return_type="b10",
+        builtin=True,
+        impl=builtin_eof
+    ),
+    "in_all": Function(
+        name="in_all",
+        args=[],
+        return_type="str",
+        builtin=True,
+        impl=builtin_in_all
+    ),
+    "in_values": Function(
+        name="in_values",
+        args=[("b_", "count")],
+        return_type="arr",
+        builtin=True,
+        impl=builtin_in_values
+    ),
     "wait": Function(
         name="wait",
         args=[("b10", "seconds")],
@@ -69,9 +140,23 @@ BUILTINS = {
         builtin=True,
         impl=builtin_wait
     ),
+    "now": Function(
+        name="now",
+        args=[],
+        return_type="b10",
+        builtin=True,
+        impl=builtin_now
+    ),
+    "join": Function(
+        name="join",
+        args=[("any", "task")],
+        return_type="any",
+        builtin=True,
+        impl=tasks.join
+    ),
     "len": Function(
         name="len",
-        args=[("str", "text")],
+        args=[("any", "value")],
         return_type="b10",
         builtin=True,
         impl=builtin_len
@@ -111,19 +196,61 @@ BUILTINS = {
         builtin=True,
         impl=builtin_sqrt
     ),
+    "mod": Function(
+        name="mod",
+        args=[("b_", "val"), ("b_", "divisor")],
+        return_type="b_",
+        builtin=True,
+        impl=builtin_mod
+    ),
+    "pow": Function(
+        name="pow",
+        args=[("b_", "val"), ("b_", "exponent"), ("b_", "modulus")],
+        return_type="b_",
+        builtin=True,
+        impl=builtin_pow
+    ),
+    "gcd": Function(
+        name="gcd",
+        args=[("b_", "a"), ("b_", "b")],
+        return_type="b_",
+        builtin=True,
+        impl=builtin_gcd
+    ),
+    "is_prime": Function(
+        name="is_prime",
+        args=[("b_", "val")],
+        return_type="b_",
+        builtin=True,
+        impl=builtin_is_prime
+    ),
+    "factorial": Function(
+        name="factorial",
+        args=[("b_", "val")],
+        return_type="b_",
+        builtin=True,
+        impl=builtin_factorial
+    ),
     "number": Function(
         name="number",
         args=[("str", "raw")],
         return_type="b10",
         builtin=True,
-        impl=lambda s: BaseLiteral(10, s)
+        impl=lambda s: BaseLiteral.parse(10, s)
     ),
     "funcs": Function(
         name="funcs",
         args=[],
         return_type=None,
         builtin=True,
-        impl=lambda: print("Available functions: " + ", ".join(BUILTINS.keys()))
+        impl=lambda: output.write("Available functions: " + ", ".join(BUILTINS.keys()) + "\n")
+    ),
+    "flush": Function(
+        name="flush",
+        args=[],
+        return_type=None,
+        builtin=True,
+        impl=output.flush
     ),
     "rebase": Function(
         name="rebase",
@@ -132,4 +259,39 @@ BUILTINS = {
         builtin=True,
         impl=builtin_rebase
     ),
+    "range": Function(
+        name="range",
+        args=[("b_", "count")],
+        return_type="arr",
+        builtin=True,
+        impl=BaseArray.range
+    ),
+    "sum": Function(
+        name="sum",
+        args=[("arr", "values")],
+        return_type="b_",
+        builtin=True,
+        impl=BaseArray.sum
+    ),
+    "at": Function(
+        name="at",
+        args=[("arr", "values"), ("b_", "index")],
+        return_type="b_",
+        builtin=True,
+        impl=BaseArray.at
+    ),
+    "map_add": Function(
+        name="map_add",
+        args=[("arr", "values"), ("b_", "val")],
+        return_type="arr",
+        builtin=True,
+        impl=BaseArray.__add__
+    ),
+    "rebase_all": Function(
+        name="rebase_all",
+        args=[("arr", "values"), ("b_", "base")],
+        return_type="arr",
+        builtin=True,
+        impl=builtin_rebase_all
+    ),
 }
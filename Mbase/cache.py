@@ -0,0 +1,157 @@
+import gc
+import hashlib
+import itertools
+import os
+import pickle
+
+from Mbase import config
+
+# Bump whenever the pickled layout of the AST, Function or BaseLiteral changes
+CACHE_FORMAT = 11
+MAGIC = b"MBLC"
+KEY_SIZE = hashlib.sha256().digest_size
+CHUNK_SIZE = 256
+READ_SIZE = 1 << 20
+LOAD_ERRORS = (
+    OSError,
+    EOFError,
+    ValueError,
+    TypeError,
+    IndexError,
+    AttributeError,
+    ImportError,
+    RecursionError,
+    pickle.UnpicklingError,
+)
+
+
+def cache_path(path: str) -> str:
+    cfg = config.get_config()
+    directory, name = os.path.split(os.path.abspath(path))
+    if cfg.cache_prefix:
+        directory = os.path.join(cfg.cache_prefix, os.path.splitdrive(directory)[1].lstrip(os.sep))
+    else:
+        directory = os.path.join(directory, cfg.cache_dir)
+    return os.path.join(directory, name + "c")
+
+
+def cache_key(source: str) -> bytes:
+    cfg = config.get_config()
+    digest = hashlib.sha256(f"{cfg.app_name} {cfg.version} {CACHE_FORMAT}\0".encode())
+    digest.update(source.encode(cfg.file_encoding, "surrogatepass"))
+    return digest.digest()
+
+
+def load(path: str, source: str):
+    # Returns an iterator over the cached top-level statements, or None if there is no valid entry.
+    # The whole body is checked against its digest before anything is handed out, so a damaged
+    # entry is dropped and reparsed instead of failing halfway through a --stream run.
+    target = cache_path(path)
+    try:
+        f = open(target, "rb")
+    except OSError:
+        return None
+    try:
+        if f.read(len(MAGIC) + KEY_SIZE) != MAGIC + cache_key(source):
+            f.close()
+            return None
+        expected = f.read(KEY_SIZE)
+        start = f.tell()
+        digest = hashlib.sha256()
+        while block := f.read(READ_SIZE):
+            digest.update(block)
+        if digest.digest() != expected:
+            raise ValueError("cache entry does not match its digest")
+        f.seek(start)
+        chunks = _records(f)
+        # Unpickling the first chunk surfaces classes that no longer load
+        first = next(chunks, ())
+    except LOAD_ERRORS:
+        f.close()
+        _remove(target)
+        return None
+    return itertools.chain(first, itertools.chain.from_iterable(chunks))
+
+
+def _records(f):
+    # Yields the chunks of statements one at a time
+    with f:
+        while True:
+            # The AST is acyclic; collecting while millions of nodes are created only costs time
+            enabled = gc.isenabled()
+            gc.disable()
+            try:
+                chunk = pickle.load(f)
+            except EOFError:
+                return
+            finally:
+                if enabled:
+                    gc.enable()
+            yield chunk
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class CacheWriter:
+    # Statements are written in chunks of CHUNK_SIZE so streaming runs never hold the whole AST
+    def __init__(self, path: str, source: str):
+        self.target = cache_path(path)
+        self.tmp = f"{self.target}.{os.getpid()}.tmp"
+        self.file = None
+        self.chunk = []
+        self.digest = hashlib.sha256()
+        try:
+            os.makedirs(os.path.dirname(self.target), exist_ok=True)
+            self.file = open(self.tmp, "wb")
+            # The digest of the body is filled in by commit()
+            self.file.write(MAGIC + cache_key(source) + bytes(KEY_SIZE))
+        except OSError:
+            self.discard()
+
+    def add(self, stmt):
+        self.chunk.append(stmt)
+        if len(self.chunk) >= CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.file is None:
+            self.chunk = []
+            return
+        try:
+            data = pickle.dumps(self.chunk, pickle.HIGHEST_PROTOCOL)
+            self.file.write(data)
+            self.digest.update(data)
+        except Exception:
+            # Whatever goes wrong (a deeply nested AST overflows the pickler's recursion), writing
+            # the cache must never stop the program from running
+            self.discard()
+        self.chunk = []
+
+    def commit(self):
+        if self.chunk:
+            self.flush()
+        if self.file is None:
+            return
+        try:
+            self.file.seek(len(MAGIC) + KEY_SIZE)
+            self.file.write(self.digest.digest())
+            self.file.close()
+            os.replace(self.tmp, self.target)
+        except Exception:
+            self.discard()
+        self.file = None
+
+    def discard(self):
+        self.chunk = []
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        try:
+            os.remove(self.tmp)
+        except OSError:
+            pass
@@ -0,0 +1,78 @@
+import asyncio
+import selectors
+import time
+
+from Mbase import config
+
+# The time scripts see through wait() and now(). The real clock sleeps; the virtual clock never
+# does: wait() moves it forward by the time asked for, so timing-based scripts run at CPU speed
+# and still see the same timeline. With tasks the event loop keeps its timers on this clock and
+# jumps to the next one whenever no task can run.
+
+CLOCKS = ("real", "virtual")
+
+
+class Clock:
+    def __init__(self, virtual: bool):
+        self.virtual = virtual
+        self.start = time.monotonic()
+        self.elapsed = 0.0
+
+    def time(self) -> float:
+        if self.virtual:
+            return self.start + self.elapsed
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if self.virtual:
+            self.elapsed += seconds
+        else:
+            time.sleep(seconds)
+
+    def millis(self) -> int:
+        # Milliseconds since the program started
+        return int((self.time() - self.start) * 1000)
+
+    def new_event_loop(self):
+        if not self.virtual:
+            return asyncio.new_event_loop()
+        return _VirtualLoop(self)
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    # Polls instead of blocking until a timer is due, and moves the clock to that timer instead
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+
+    def select(self, timeout=None):
+        if timeout is None:
+            return super().select(None)
+        events = super().select(0)
+        if not events and timeout > 0:
+            self.clock.elapsed += timeout
+        return events
+
+
+class _VirtualLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock):
+        super().__init__(_VirtualSelector(clock))
+        self.clock = clock
+
+    def time(self):
+        return self.clock.time()
+
+
+_clock: Clock | None = None
+
+
+def init(virtual: bool | None = None) -> Clock:
+    global _clock
+    if virtual is None:
+        virtual = config.init().clock == "virtual"
+    _clock = Clock(virtual)
+    return _clock
+
+
+def get_clock() -> Clock:
+    return _clock or init()
@@ -19,6 +19,20 @@ class Config:
         self.file_encoding = "utf-8"
         self.file_extension = ".mbl"
 
+        # Parsed-AST cache, like __pycache__; MBASE_CACHE_PREFIX moves all entries into one tree
+        self.cache_dir = "__mbcache__"
+        self.cache_prefix = os.environ.get("MBASE_CACHE_PREFIX")
+
+        # Results kept per pure function before the least recently used one is dropped
+        self.memo_size = 1024
+
+        # Program output: characters buffered before a write, and whether every line is flushed
+        self.output_buffer = 64 * 1024
+        self.flush_policy = "line" if sys.stdout.isatty() else "block"
+
+        # "virtual" makes wait() advance a simulated clock instead of sleeping
+        self.clock = "real"
+
         # Startup time
         self.start_time = time.time()
         self.color_support = self._detect_color_support()
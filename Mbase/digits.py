@@ -0,0 +1,166 @@
+import decimal
+
+# Conversion between ints and digit strings of bases 2-64. Bases Python's int() and format()
+# understand use them; everything else splits the digits in half around a precomputed power
+# of the base, so long numbers cost a few big multiplications instead of one step per digit.
+
+VALID_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ+/"
+
+# Digit sets of every base and the value of every digit
+BASE_DIGITS = [frozenset(VALID_DIGITS[:base]) for base in range(len(VALID_DIGITS) + 1)]
+DIGIT_VALUES = {ch: value for value, ch in enumerate(VALID_DIGITS)}
+FORMAT_SPECS = {2: "b", 8: "o", 16: "x"}
+
+# Bits per digit of the power-of-two bases, whose digits map straight to groups of bits; int()
+# reads those up to base 32 in linear time and TO_BITS spells base 64 digits out in binary for it
+DIGIT_BITS = {2 ** bits: bits for bits in range(1, 7)}
+TO_BITS = {64: str.maketrans({ch: format(value, "06b") for value, ch in enumerate(VALID_DIGITS)})}
+
+# Digit strings up to this length are converted in one go; it stays well below the int/str
+# conversion limit of sys.get_int_max_str_digits()
+LEAF_DIGITS = 256
+# Decimal conversion splits ints by bits down to this size
+LEAF_BITS = 1024
+# Divisions of numbers up to this many bits past the divisor are left to divmod()
+DIVMOD_BITS = 4000
+
+_powers = {}
+
+
+def base_power(base: int, exponent: int) -> int:
+    # Exponents are LEAF_DIGITS times a power of two, so every square is reused
+    power = _powers.get((base, exponent))
+    if power is None:
+        if exponent > LEAF_DIGITS:
+            half = base_power(base, exponent // 2)
+            power = half * half
+        else:
+            power = base ** exponent
+        _powers[(base, exponent)] = power
+    return power
+
+
+def parse_digits(base: int, raw: str) -> int:
+    # raw holds only digits of base
+    if not raw:
+        return 0
+    if base in DIGIT_BITS:
+        return int(raw, base) if base <= 36 else int(raw.translate(TO_BITS[base]), 2)
+    return _parse_split(base, raw)
+
+
+def _parse_split(base, raw):
+    n = len(raw)
+    if n <= LEAF_DIGITS:
+        if base <= 36:
+            return int(raw, base)
+        value = 0
+        for ch in raw:
+            value = value * base + DIGIT_VALUES[ch]
+        return value
+    low = LEAF_DIGITS
+    while low * 2 < n:
+        low *= 2
+    return _parse_split(base, raw[:n - low]) * base_power(base, low) + _parse_split(base, raw[n - low:])
+
+
+def render_digits(base: int, value: int) -> str:
+    spec = FORMAT_SPECS.get(base)
+    if spec is not None:
+        return format(value, spec)
+    if base in DIGIT_BITS:
+        return _render_bits(base, value)
+    if base == 10:
+        try:
+            return str(value)
+        except ValueError:
+            # Past the int/str conversion limit
+            return str(_to_decimal(value))
+    return _render_split(base, value, 0)
+
+
+def _render_bits(base, value):
+    bits = DIGIT_BITS[base]
+    binary = format(value, "b")
+    binary = binary.zfill(-(-len(binary) // bits) * bits)
+    return "".join(VALID_DIGITS[int(binary[i:i + bits], 2)] for i in range(0, len(binary), bits))
+
+
+def _render_split(base, value, width):
+    # Renders value padded with zeros to width digits
+    if value < base_power(base, LEAF_DIGITS):
+        result = []
+        while value > 0:
+            value, digit = divmod(value, base)
+            result.append(VALID_DIGITS[digit])
+        return "".join(reversed(result)).rjust(width or 1, "0")
+    low = LEAF_DIGITS
+    while base_power(base, low * 2) <= value:
+        low *= 2
+    high, value = _divmod(value, base_power(base, low))
+    return _render_split(base, high, max(width - low, 0)) + _render_split(base, value, low)
+
+
+def _divmod(a, b):
+    # divmod() is quadratic in CPython. For a < b ** 2, which is all _render_split asks for,
+    # recursive division (Burnikel-Ziegler) gets there with a few big multiplications.
+    n = b.bit_length()
+    if a.bit_length() - n <= DIVMOD_BITS:
+        return divmod(a, b)
+    pad = n & 1
+    if pad:
+        a <<= 1
+        b <<= 1
+        n += 1
+    half = n >> 1
+    mask = (1 << half) - 1
+    b1, b2 = b >> half, b & mask
+    q1, r = _divmod_3by2(a >> n, (a >> half) & mask, b, b1, b2, half)
+    q2, r = _divmod_3by2(r, a & mask, b, b1, b2, half)
+    if pad:
+        r >>= 1
+    return q1 << half | q2, r
+
+
+def _divmod_3by2(a12, a3, b, b1, b2, n):
+    if a12 >> n == b1:
+        q, r = (1 << n) - 1, a12 - (b1 << n) + b1
+    else:
+        q, r = _divmod(a12, b1)
+    r = (r << n | a3) - q * b2
+    while r < 0:
+        q -= 1
+        r += b
+    return q, r
+
+
+def _to_decimal(value):
+    # decimal multiplies big numbers in subquadratic time, so the int is split by bits (free) and
+    # put back together with decimal arithmetic; str() of the result is linear
+    powers = {}
+
+    def power_of_two(bits):
+        power = powers.get(bits)
+        if power is None:
+            if bits <= LEAF_BITS:
+                power = decimal.Decimal(2) ** bits
+            else:
+                half = bits >> 1
+                power = power_of_two(half) * power_of_two(bits - half)
+            powers[bits] = power
+        return power
+
+    def convert(value, bits):
+        if bits <= LEAF_BITS:
+            return decimal.Decimal(value)
+        half = bits >> 1
+        high = value >> half
+        low = value - (high << half)
+        return convert(low, half) + convert(high, bits - half) * power_of_two(half)
+
+    with decimal.localcontext() as ctx:
+        ctx.prec = decimal.MAX_PREC
+        ctx.Emax = decimal.MAX_EMAX
+        ctx.Emin = decimal.MIN_EMIN
+        ctx.traps[decimal.Inexact] = True
+        return convert(value, value.bit_length())
@@ -1,11 +1,11 @@
-from Mbase import config
+from Mbase import config, output
 
 def print_error(message: str, prefix: str = "[Error]"):
     cfg = config.get_config()
     if cfg.color_support:
-        print(f"\033[91m{prefix}: {message}\033[0m")  # Red
+        output.write(f"\033[91m{prefix}: {message}\033[0m\n")  # Red
     else:
-        print(f"{prefix}: {message}")
+        output.write(f"{prefix}: {message}\n")
 
 def print_error_with_origin(source: str, position: int, message: str, filename: str = "<input>", label: str = "Runtime Error"):
     cfg = config.get_config()
@@ -18,14 +18,14 @@ def print_error_with_origin(source: str, position: int, message: str, filename:
         if line_end >= position:
             col = position - char_count
             line_no = i + 1
-            print(f"{filename}:{line_no}:{col + 1}")
+            output.write(f"{filename}:{line_no}:{col + 1}\n")
 
             if cfg.color_support:
-                print(f"\033[93m{line}\033[0m")
-                print(f"\033[93m{' ' * col}^\033[0m")
+                output.write(f"\033[93m{line}\033[0m\n")
+                output.write(f"\033[93m{' ' * col}^\033[0m\n")
             else:
-                print(line)
-                print(" " * col + "^")
+                output.write(line + "\n")
+                output.write(" " * col + "^\n")
 
             print_error(message, f"[{label}]")
             return
@@ -33,3 +33,8 @@ def print_error_with_origin(source: str, position: int, message: str, filename:
 
     print_error(message, f"[{label}]")
 
+
+class PositionedSyntaxError(SyntaxError):
+    def __init__(self, message: str, pos: int):
+        super().__init__(message)
+        self.pos = pos
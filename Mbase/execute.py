@@ -1,11 +1,27 @@
+import sys
+
+from Interpreter.closure import evaluate_compiled
 from Interpreter.evaluate import evaluate
-from Mbase import config
-from Mbase.error import print_error_with_origin, print_error
+from Interpreter.optimize import optimize as optimize_ast
+from Interpreter.runtime import memo_stats
+from Interpreter.transpile import evaluate_python
+from Interpreter.vm import evaluate_vm
+from Interpreter import bytecode
+from Mbase import cache, config, output, tasks
+from Mbase.reader import get_reader
+from Mbase.error import PositionedSyntaxError, print_error_with_origin, print_error
 from Parser import tokenizer
 from Parser.parse import Parser
 from Mbase.builtin import *
 
-def repl():
+ENGINES = {
+    "tree": evaluate,
+    "closure": evaluate_compiled,
+    "vm": evaluate_vm,
+    "python": evaluate_python,
+}
+
+def repl(engine: str = "tree", optimize: int = 1):
     cfg = config.get_config()
     cfg.display_startup()
 
@@ -16,9 +32,10 @@ def repl():
     while True:
         try:
             prompt = cfg.repl_multiline_prompt if open_braces > 0 else cfg.repl_prompt
-            user_input = input(prompt)
+            output.flush()
+            user_input = get_reader().read_line(prompt)
         except (EOFError, KeyboardInterrupt):
-            print()
+            output.write("\n")
             break
 
         if user_input.strip().lower() in ["exit", "quit"]:
@@ -31,12 +48,13 @@ def repl():
         if open_braces > 0:
             continue
 
-        _run_buffer(buffer, ctx)
+        _run_buffer(buffer, ctx, engine=engine, optimize=optimize)
         buffer = ""
         open_braces = 0
+    tasks.finish()
 
 
-def run_file(path: str):
+def run_file(path: str, stream: bool = False, use_cache: bool = True, engine: str = "tree", optimize: int = 1):
     try:
         with open(path, "r", encoding="utf-8") as f:
             source = f.read()
@@ -44,47 +62,115 @@ def run_file(path: str):
         print_error(str(e), f"[File Error]: Cannot open file '{path}'")
         return
 
+    statements = cache.load(path, source) if use_cache else None
+    if statements is None:
+        writer = cache.CacheWriter(path, source) if use_cache else None
+        statements = _parse(source, stream, writer)
+
     ctx = {}
-    _run_buffer(source, ctx, filename=path)
+    _run_buffer(source, ctx, filename=path, stream=stream, statements=statements, engine=engine, optimize=optimize)
+    tasks.finish()
+
+
+def disassemble_file(path: str, optimize: int = 1):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+    except Exception as e:
+        print_error(str(e), f"[File Error]: Cannot open file '{path}'")
+        return
+
+    try:
+        statements = Parser(tokenizer.tokenize(source), source).parse()
+        if optimize:
+            statements = list(optimize_ast(statements, whole_program=True))
+    except PositionedSyntaxError as e:
+        print_error_with_origin(source, e.pos, str(e), path, label="Syntax Error")
+        return
+    except Exception as e:
+        print_error(str(e), "[Parse Error]")
+        return
 
+    seen = set()
+    for i, stmt in enumerate(statements):
+        if i:
+            output.write("\n")
+        output.write(bytecode.disassemble(bytecode.compile_statement(stmt), seen) + "\n")
 
-def _run_buffer(source: str, ctx: dict, filename: str = "<input>"):
+
+def print_memo_stats():
+    for line in memo_stats():
+        print(f"[memo] {line}", file=sys.stderr)
+
+
+def _parse(source: str, stream: bool, writer: cache.CacheWriter | None = None):
+    parser = Parser(tokenizer.tokenize(source), source)
+    if writer is None:
+        # Statement N runs before statement N + 1 is tokenized
+        yield from (parser.parse_stream() if stream else parser.parse())
+        return
+
+    try:
+        if stream:
+            for stmt in parser.parse_stream():
+                writer.add(stmt)
+                yield stmt
+            writer.commit()
+        else:
+            ast = parser.parse()
+            for stmt in ast:
+                writer.add(stmt)
+            writer.commit()
+            yield from ast
+    finally:
+        writer.discard()
+
+
+def _run_buffer(source: str, ctx: dict, filename: str = "<input>", stream: bool = False, statements=None,
+                engine: str = "tree", optimize: int = 1):
+    run = ENGINES[engine]
     is_repl = filename == "<input>"
     ctx["__source__"] = source
     ctx["__filename__"] = filename
     ctx["__origin__"] = "<repl>" if is_repl else filename
     ctx["__functions__"] = BUILTINS
 
-    try:
-        tokens = list(tokenizer.tokenize(source))
-        if not tokens:
+    if statements is None:
+        statements = _parse(source, stream)
+    if optimize:
+        # The cache keeps the parsed AST, so the same entry serves every -O level
+        statements = optimize_ast(statements, whole_program=not stream)
+    while True:
+        try:
+            expr = next(statements, None)
+        except PositionedSyntaxError as e:
+            print_error_with_origin(source, e.pos, str(e), ctx["__origin__"], label="Syntax Error")
             return
-        parser = Parser(tokens)
-        ast = parser.parse()
-    except (SyntaxError, TypeError) as e:
-        print_error(str(e), "[Syntax Error]" if isinstance(e, SyntaxError) else "[Type Error]")
-        return
-    except Exception as e:
-        print_error(str(e), "[Parse Error]")
-        return
+        except (SyntaxError, TypeError) as e:
+            print_error(str(e), "[Syntax Error]" if isinstance(e, SyntaxError) else "[Type Error]")
+            return
+        except Exception as e:
+            print_error(str(e), "[Parse Error]")
+            return
+        if expr is None:
+            break
 
-    for expr in ast:
         try:
-            result = evaluate(expr, ctx)
+            result = run(expr, ctx)
 
             if is_repl:
                 printed = False
 
                 if isinstance(expr, tuple) and expr[0] == "call" and expr[1] == "out":
-                    print()
+                    output.write("\n")
                     printed = True
 
                 elif result is not None:
-                    print(result)
+                    output.write(f"{result}\n")
                     printed = True
 
                 if not printed:
-                    print()
+                    output.write("\n")
 
 
         except Exception as e:
@@ -1,10 +1,61 @@
-from Mbase import config, execute
+from Mbase import clock, config, execute, output
+import argparse
 import sys
 
 def main():
-    config.init()
+    cfg = config.init()
 
-    if len(sys.argv) > 1:
-        execute.run_file(sys.argv[1])
-    else:
-        execute.repl()
+    parser = argparse.ArgumentParser(prog="run.py", description=cfg.description)
+    parser.add_argument("file", nargs="?", help=f"script to run ({cfg.file_extension}); starts the REPL if omitted")
+    parser.add_argument("--stream", action="store_true",
+                        help="execute each top-level statement as soon as it is parsed")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"neither read nor write the parsed-AST cache ({cfg.cache_dir}/*.mblc)")
+    parser.add_argument("--engine", choices=execute.ENGINES, default="tree",
+                        help="evaluator to run the program with (default: tree)")
+    parser.add_argument("-O", dest="optimize", type=int, choices=(0, 1), default=1,
+                        help="-O0 runs the AST as parsed, -O1 folds constants and dead code first (default: 1)")
+    parser.add_argument("--memo-size", type=int, default=cfg.memo_size, metavar="N",
+                        help=f"results kept per pure function (default: {cfg.memo_size})")
+    parser.add_argument("--memo-stats", action="store_true",
+                        help="print cache hits and misses of every pure function on exit (to stderr)")
+    parser.add_argument("--flush", choices=output.POLICIES, default=cfg.flush_policy,
+                        help="flush output after every line or only when the buffer is full "
+                             f"(default: {cfg.flush_policy}); in(), wait(), flush() and exit always flush")
+    parser.add_argument("--output-buffer", type=int, default=cfg.output_buffer, metavar="N",
+                        help=f"characters of output buffered before a write (default: {cfg.output_buffer})")
+    parser.add_argument("--clock", choices=clock.CLOCKS, default=cfg.clock,
+                        help="real sleeps in wait(); virtual advances a simulated clock instead, so "
+                             "timing-based scripts run at full speed (default: real)")
+    parser.add_argument("--dis", action="store_true",
+                        help="print the bytecode the vm engine would run instead of running the file")
+    parser.add_argument("--lsp", action="store_true",
+                        help="run the language server on stdin/stdout")
+    args = parser.parse_args()
+    if args.memo_size < 1:
+        parser.error("--memo-size must be at least 1")
+    if args.output_buffer < 1:
+        parser.error("--output-buffer must be at least 1")
+    cfg.memo_size = args.memo_size
+    cfg.output_buffer = args.output_buffer
+    cfg.flush_policy = args.flush
+    cfg.clock = args.clock
+
+    if args.lsp:
+        from Lsp.server import serve
+        sys.exit(serve())
+
+    output.init()
+    clock.init()
+    try:
+        if args.dis and args.file:
+            execute.disassemble_file(args.file, optimize=args.optimize)
+        elif args.file:
+            execute.run_file(args.file, stream=args.stream, use_cache=not args.no_cache, engine=args.engine,
+                             optimize=args.optimize)
+        else:
+            execute.repl(engine=args.engine, optimize=args.optimize)
+    finally:
+        output.flush()
+    if args.memo_stats:
+        execute.print_memo_stats()
@@ -0,0 +1,34 @@
+# Integer algorithms behind the math built-ins that the math module has no counterpart for.
+# Everything is exact: no value goes through a float.
+
+SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+# Miller-Rabin with the first twelve primes as bases decides every n below this bound; above it
+# all SMALL_PRIMES are used, and a composite passing them is possible but has to be built for it
+DETERMINISTIC_LIMIT = 318665857834031151167461
+DETERMINISTIC_BASES = SMALL_PRIMES[:12]
+
+
+def is_prime(n: int) -> bool:
+    if n < 2:
+        return False
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    if n < SMALL_PRIMES[-1] ** 2:
+        return True
+
+    # n - 1 = d * 2**s with d odd
+    s = ((n - 1) & (1 - n)).bit_length() - 1
+    d = (n - 1) >> s
+    for a in DETERMINISTIC_BASES if n < DETERMINISTIC_LIMIT else SMALL_PRIMES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
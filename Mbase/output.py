@@ -0,0 +1,77 @@
+import os
+import sys
+
+from Mbase import config
+
+# Everything the interpreter prints goes through one buffer, which is encoded in one piece and
+# written to the binary layer of stdout. With the "line" policy it is flushed after every
+# fragment holding a newline, with "block" once buffer_size characters are pending. Both flush
+# before in() reads and wait() sleeps, on flush() and when the program exits.
+
+POLICIES = ("line", "block")
+
+
+class Output:
+    def __init__(self, buffer_size: int, policy: str):
+        self.buffer_size = buffer_size
+        self.parts = []
+        self.pending = 0
+        if policy == "line":
+            self.write = self.write_line
+
+    def write(self, text: str):
+        self.parts.append(text)
+        self.pending += len(text)
+        if self.pending >= self.buffer_size:
+            self.flush()
+
+    def write_line(self, text: str):
+        self.parts.append(text)
+        self.pending += len(text)
+        if "\n" in text or self.pending >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self.parts:
+            return
+        text = "".join(self.parts)
+        self.parts.clear()
+        self.pending = 0
+        # stdout is looked up now, so redirecting sys.stdout still catches the output
+        stream = sys.stdout
+        binary = getattr(stream, "buffer", None)
+        if binary is None:
+            stream.write(text)
+            stream.flush()
+            return
+        if os.linesep != "\n":
+            text = text.replace("\n", os.linesep)
+        # Drain whatever was printed straight to the text layer first, so nothing is reordered
+        stream.flush()
+        binary.write(text.encode(stream.encoding or "utf-8", stream.errors or "strict"))
+        binary.flush()
+
+
+_output: Output | None = None
+_write = None
+
+
+def init(buffer_size: int | None = None, policy: str | None = None) -> Output:
+    global _output, _write
+    if _output is not None:
+        _output.flush()
+    cfg = config.init()
+    _output = Output(buffer_size or cfg.output_buffer, policy or cfg.flush_policy)
+    _write = _output.write
+    return _output
+
+
+def write(text: str):
+    if _write is None:
+        init()
+    _write(text)
+
+
+def flush():
+    if _output is not None:
+        _output.flush()
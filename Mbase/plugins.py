@@ -0,0 +1,66 @@
+import importlib
+import re
+
+from Mbase.types import ANY_BASE, Function
+
+# Built-ins written in Python outside the interpreter. A plugin module declares each function once
+# with @native("fn name(type arg, ...) type"); `use name` imports Plugins/<name>.py, or an installed
+# module mbase_<name>, the first time any program asks for it and adds its functions to the built-ins.
+#
+# Native functions are called without check_args. In exchange they have to fail with TypeError or
+# AttributeError on an argument outside their signature (reading .value of a str does); the engines
+# then check the signature, so a bad call is still reported like for any other built-in. A fixed
+# base such as b10 cannot be told apart by failing, so those functions are checked on every call.
+
+SIGNATURE = re.compile(r"fn\s+(\w+)\s*\(([^)]*)\)\s*(\w*)")
+MODULES = ("Plugins.{}", "mbase_{}")
+
+# Functions declared by each module, and the functions of each plugin loaded so far
+_declared = {}
+_loaded = {}
+
+
+def native(signature: str):
+    match = SIGNATURE.fullmatch(signature.strip())
+    if match is None:
+        raise SyntaxError(f"Invalid native signature '{signature}'")
+    name, params, return_type = match.groups()
+    args = [tuple(param.split()) for param in params.split(",")] if params.strip() else []
+    if any(len(arg) != 2 for arg in args):
+        raise SyntaxError(f"Invalid native signature '{signature}'")
+
+    def register(func):
+        fn = Function(name, args, return_type or None, builtin=True, impl=func)
+        for (expected_type, _), expected in zip(args, fn.params):
+            if isinstance(expected, str):
+                raise TypeError(f"'{name}': unknown parameter type '{expected_type}'")
+        # Bases are 2 and up; b_, str, arr and any compile to ANY_BASE or below
+        fn.native = all(expected <= ANY_BASE for expected in fn.params)
+        _declared.setdefault(func.__module__, {})[name] = fn
+        return func
+    return register
+
+
+def use(name: str, functions: dict) -> dict:
+    plugin = _loaded.get(name)
+    if plugin is None:
+        plugin = _loaded[name] = _load(name)
+    functions.update(plugin)
+    return plugin
+
+
+def _load(name):
+    for pattern in MODULES:
+        module_name = pattern.format(name)
+        try:
+            module = importlib.import_module(module_name)
+        except ModuleNotFoundError as e:
+            # Only a missing plugin moves on; a plugin missing one of its own imports is an error
+            if e.name != module_name and not module_name.startswith(f"{e.name}."):
+                raise
+            continue
+        declared = _declared.get(module.__name__)
+        if not declared:
+            raise ImportError(f"Plugin '{name}' declares no native functions")
+        return declared
+    raise ImportError(f"Unknown plugin '{name}'")
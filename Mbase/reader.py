@@ -0,0 +1,91 @@
+import sys
+
+from Mbase import output
+
+# Line input for in() and the REPL. A terminal is read with input(), so line editing keeps
+# working. Anything else (a pipe or a file) is read in blocks of BLOCK_SIZE characters that are
+# split into lines once, after which in() only hands out the next line of the block.
+
+BLOCK_SIZE = 1 << 20
+
+
+class Reader:
+    def __init__(self, stream):
+        self.stream = stream
+        self.interactive = stream.isatty()
+        self.lines = []
+        self.index = 0
+        # The unterminated last line of the blocks read so far
+        self.tail = ""
+        self.ended = False
+
+    def _fill(self) -> bool:
+        # Reads blocks until a whole line is available; False once the input has ended
+        while self.index >= len(self.lines):
+            if self.ended:
+                return False
+            block = self.stream.read(BLOCK_SIZE)
+            if not block:
+                self.ended = True
+                self.lines, self.index = ([self.tail] if self.tail else []), 0
+                self.tail = ""
+                continue
+            lines = block.split("\n")
+            lines[0] = self.tail + lines[0]
+            self.tail = lines.pop()
+            self.lines, self.index = lines, 0
+        return True
+
+    def read_line(self, prompt: str = "") -> str:
+        if self.interactive:
+            try:
+                return input(prompt)
+            except EOFError:
+                self.ended = True
+                raise
+        if prompt:
+            output.write(prompt)
+        if not self._fill():
+            raise EOFError("EOF when reading a line")
+        line = self.lines[self.index]
+        self.index += 1
+        return line
+
+    def read_lines(self, count: int) -> list:
+        if self.interactive:
+            return [self.read_line() for _ in range(count)]
+        lines = []
+        while len(lines) < count:
+            if not self._fill():
+                raise EOFError(f"EOF after {len(lines)} of {count} lines")
+            stop = min(len(self.lines), self.index + count - len(lines))
+            lines.extend(self.lines[self.index:stop])
+            self.index = stop
+        return lines
+
+    def read_all(self) -> str:
+        if self.interactive:
+            rest = self.stream.read()
+        else:
+            rest = "\n".join(self.lines[self.index:]) + ("\n" if self.index < len(self.lines) else "")
+            rest += self.tail + self.stream.read()
+            self.lines, self.index, self.tail = [], 0, ""
+        self.ended = True
+        return rest[:-1] if rest.endswith("\n") else rest
+
+    def at_end(self) -> bool:
+        # A terminal only reports the end once a read has run into it
+        if self.interactive:
+            return self.ended
+        return not self._fill()
+
+
+_reader: Reader | None = None
+
+
+def get_reader() -> Reader:
+    # sys.stdin is looked up on every call, so replacing it switches to a new reader
+    global _reader
+    if _reader is None or _reader.stream is not sys.stdin:
+        _reader = Reader(sys.stdin)
+    return _reader
@@ -0,0 +1,160 @@
+import asyncio
+import threading
+
+from Mbase.clock import get_clock
+from Mbase.error import print_error
+
+# Tasks started with spawn f(...). An asyncio event loop on a scheduler thread decides which task
+# runs; each task keeps its interpreter stack on a thread of its own, but only the task the loop
+# has resumed runs, so tasks switch only where they suspend: in wait(), in(), out() and join().
+# Suspending hands the loop something to await (a sleep, a read, another task) and parks the
+# thread until the loop resumes it with the result. The main program is task 0. Until the first
+# spawn there is no scheduler and the suspension points just block, as they always did.
+# Timers run on Mbase/clock.py, so under the virtual clock tasks wait without sleeping.
+
+
+class Task:
+    __slots__ = ("name", "number", "resume", "suspended", "pending", "outcome", "finished", "done", "result",
+                 "failure")
+
+    def __init__(self, name, number, finished=None):
+        self.name = name
+        self.number = number
+        # The loop releases resume to run the task; the task releases suspended to give the turn back
+        self.resume = threading.Semaphore(0)
+        self.suspended = threading.Semaphore(0)
+        self.pending = None
+        self.outcome = None
+        self.finished = finished
+        self.done = False
+        self.result = None
+        self.failure = None
+
+    def __str__(self):
+        return f"<task {self.name}#{self.number}>"
+
+
+class Scheduler:
+    def __init__(self):
+        self.loop = get_clock().new_event_loop()
+        self.main = Task("main", 0)
+        self.current = self.main
+        self.tasks = []
+        self.reading = threading.Lock()
+        self.loop.create_task(self._drive(self.main, True))
+        threading.Thread(target=self.loop.run_forever, name="mbase-scheduler", daemon=True).start()
+
+    async def _drive(self, task, running):
+        # Runs in the loop. While a task has the turn the loop is blocked, so no other task starts.
+        while True:
+            if not running:
+                self.current = task
+                task.resume.release()
+            running = False
+            task.suspended.acquire()
+            if task.done:
+                task.finished.set_result(None)
+                return
+            try:
+                task.outcome = (await task.pending(), None)
+            except Exception as e:
+                task.outcome = (None, e)
+
+    def _start(self, task):
+        self.loop.create_task(self._drive(task, False))
+
+    def _run(self, task, target):
+        task.resume.acquire()
+        try:
+            task.result = target()
+        except Exception as e:
+            task.failure = e
+            print_error(f"{task}: {e}", "[Runtime Error]")
+        task.done = True
+        task.suspended.release()
+
+    def spawn(self, name, target):
+        task = Task(name, len(self.tasks) + 1, self.loop.create_future())
+        self.tasks.append(task)
+        threading.Thread(target=self._run, args=(task, target), name=str(task), daemon=True).start()
+        self.loop.call_soon_threadsafe(self._start, task)
+        return task
+
+    def suspend(self, make_awaitable):
+        # Called by the running task: the loop awaits make_awaitable() and resumes it with the result
+        task = self.current
+        task.pending = make_awaitable
+        task.suspended.release()
+        task.resume.acquire()
+        value, error = task.outcome
+        task.pending = task.outcome = None
+        if error is not None:
+            raise error
+        return value
+
+    def blocking(self, read):
+        # Blocking reads run on the loop's executor, one at a time, while other tasks go on
+        def locked():
+            with self.reading:
+                return read()
+        return self.suspend(lambda: self.loop.run_in_executor(None, locked))
+
+    def unfinished(self):
+        return [task.finished for task in self.tasks if not task.done]
+
+
+_scheduler: Scheduler | None = None
+
+
+def spawn(name, target):
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+    return _scheduler.spawn(name, target)
+
+
+def sleep(seconds):
+    if _scheduler is None:
+        get_clock().sleep(seconds)
+    else:
+        _scheduler.suspend(lambda: asyncio.sleep(seconds))
+
+
+def blocking(read):
+    if _scheduler is None:
+        return read()
+    return _scheduler.blocking(read)
+
+
+def switch():
+    # Lets the other tasks run; a no-op until the first spawn
+    if _scheduler is not None:
+        _scheduler.suspend(lambda: asyncio.sleep(0))
+
+
+def join(task):
+    if not isinstance(task, Task):
+        raise TypeError(f"Argument 1 must be task, got {type(task).__name__}")
+    if not task.done:
+        if task is _scheduler.current:
+            raise RuntimeError(f"{task} cannot join itself")
+        _scheduler.suspend(lambda: asyncio.shield(task.finished))
+    if task.failure is not None:
+        raise RuntimeError(f"{task} failed")
+    return task.result
+
+
+def reset():
+    # Forgets the scheduler once its tasks are done; the next spawn starts one on the current clock
+    global _scheduler
+    finish()
+    if _scheduler is not None:
+        _scheduler.loop.call_soon_threadsafe(_scheduler.loop.stop)
+        _scheduler = None
+
+
+def finish():
+    # The program ends once every task has
+    while _scheduler is not None and _scheduler.unfinished():
+        futures = _scheduler.unfinished()
+        _scheduler.suspend(lambda: asyncio.wait(futures))
@@ -1,68 +1,129 @@
-VALID_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ+/"
+from Mbase.digits import BASE_DIGITS, VALID_DIGITS, parse_digits, render_digits
+
+
+# BaseLiteral is immutable, so every engine shares one instance of each small value per base;
+# counters and flags then cost no allocation. Values are never negative.
+SMALL_MAX = 1024
+_small = [None] * 2 + [[None] * (SMALL_MAX + 1) for _ in range(2, 65)]
+
+
+def _padded(raw) -> bool:
+    # Digit strings other than the canonical rendering of their value: "", or leading zeros
+    return raw is not None and (raw == "" or len(raw) > 1 and raw[0] == "0")
+
 
 class BaseLiteral:
+    # value is the canonical int; _raw is the digit string as written, or None until it is printed.
+    # Instances are immutable: _raw is only ever filled in with the rendering of value.
+    __slots__ = ("base", "value", "_raw")
+
     def __init__(self, base: int, raw: str):
         if not (2 <= base <= 64):
             raise ValueError(f"Base {base} not supported (must be 2–64).")
-        self.base = base
-        self.raw = raw.lower()
-        self._validate()
+        _set_base(self, base)
+        raw = raw.lower()
+        _set_raw(self, raw)
+        if not BASE_DIGITS[base].issuperset(raw):
+            self._validate()
+        _set_value(self, parse_digits(base, raw))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"BaseLiteral is immutable, cannot set '{name}'")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"BaseLiteral is immutable, cannot delete '{name}'")
+
+    def __reduce__(self):
+        if _padded(self._raw):
+            return BaseLiteral, (self.base, self._raw)
+        return BaseLiteral.from_int, (self.base, self.value)
 
     def _validate(self):
-        allowed = VALID_DIGITS[:self.base]
+        allowed = BASE_DIGITS[self.base]
         for ch in self.raw:
             if ch not in allowed:
                 raise ValueError(f"Digit '{ch}' not valid in base {self.base}")
 
+    @property
+    def raw(self) -> str:
+        raw = self._raw
+        if raw is None:
+            raw = render_digits(self.base, self.value)
+            _set_raw(self, raw)
+        return raw
+
     def to_int(self) -> int:
-        digits = VALID_DIGITS[:self.base]
-        val = 0
-        for ch in self.raw:
-            idx = digits.find(ch)
-            if idx == -1:
-                raise ValueError(f"Invalid digit '{ch}' for base {self.base}")
-            val = val * self.base + idx
-        return val
+        return self.value
+
+    @classmethod
+    def parse(cls, base: int, raw: str) -> "BaseLiteral":
+        # Like BaseLiteral(base, raw), but returns the shared instance for small values
+        literal = cls(base, raw)
+        if literal.value > SMALL_MAX or _padded(literal._raw):
+            return literal
+        return cls.from_int(base, literal.value)
 
     @classmethod
     def from_int(cls, base: int, value: int) -> "BaseLiteral":
         if value < 0:
             raise ValueError("BaseLiteral cannot represent negative values")
-        if value == 0:
-            return cls(base, "0")
-        digits = VALID_DIGITS[:base]
-        result = ""
-        while value > 0:
-            result = digits[value % base] + result
-            value //= base
-        return cls(base, result)
+        if not (2 <= base <= 64):
+            raise ValueError(f"Base {base} not supported (must be 2–64).")
+        if value <= SMALL_MAX:
+            small = _small[base]
+            literal = small[value]
+            if literal is None:
+                literal = small[value] = _create(base, value)
+            return literal
+        return _create(base, value)
 
     def _as_int(self, value):
+        # None for operands that apply the operator themselves, like arrays broadcasting it
         if isinstance(value, BaseLiteral):
-            return value.to_int()
+            return value.value
         elif isinstance(value, int):
             return value
+        elif getattr(value, "broadcasts", False):
+            return None
         else:
             raise TypeError(f"Cannot operate with {type(value).__name__}")
 
     def __add__(self, other):
-        result = self.to_int() + self._as_int(other)
-        return BaseLiteral.from_int(self.base, result)
+        other = self._as_int(other)
+        if other is None:
+            return NotImplemented
+        return BaseLiteral.from_int(self.base, self.value + other)
 
     def __sub__(self, other):
-        result = self.to_int() - self._as_int(other)
-        return BaseLiteral.from_int(self.base, result)
+        other = self._as_int(other)
+        if other is None:
+            return NotImplemented
+        return BaseLiteral.from_int(self.base, self.value - other)
 
     def __mul__(self, other):
-        result = self.to_int() * self._as_int(other)
-        return BaseLiteral.from_int(self.base, result)
+        other = self._as_int(other)
+        if other is None:
+            return NotImplemented
+        return BaseLiteral.from_int(self.base, self.value * other)
 
     def __truediv__(self, other):
-        result = self.to_int() // self._as_int(other)
-        return BaseLiteral.from_int(self.base, result)
+        other = self._as_int(other)
+        if other is None:
+            return NotImplemented
+        return BaseLiteral.from_int(self.base, self.value // other)
 
     def __eq__(self, other):
-        return isinstance(other, BaseLiteral) and self.base == other.base and self.raw == other.raw
+        if self is other:
+            return True
+        if not isinstance(other, BaseLiteral) or self.base != other.base or self.value != other.value:
+            return False
+        # Equal values only differ in their digits when one was written with leading zeros
+        if _padded(self._raw) or _padded(other._raw):
+            return self.raw == other.raw
+        return True
+
+    def __hash__(self):
+        return hash((self.base, self.value))
 
     def __repr__(self):
         return f"BaseLiteral({self.base}, '{self.raw}')"
@@ -73,20 +134,69 @@ class BaseLiteral:
         return f"b{self.base}@{self.raw}"
 
     def as_c_literal(self):
-        return f"{self.to_int()} /* b{self.base}@{self.raw} */"
+        return f"{self.value} /* b{self.base}@{self.raw} */"
 
     def rebase(self, target_base):
-        return BaseLiteral.from_int(target_base, self.to_int())
+        return BaseLiteral.from_int(target_base, self.value)
+
+
+# Slot setters that skip the __setattr__ guard
+_set_base = BaseLiteral.base.__set__
+_set_value = BaseLiteral.value.__set__
+_set_raw = BaseLiteral._raw.__set__
+
+
+def _create(base, value):
+    literal = object.__new__(BaseLiteral)
+    _set_base(literal, base)
+    _set_raw(literal, None)
+    if base > 36:
+        # Digits are lowercased like written ones, so the uppercase digits 36-61 read as 10-35
+        raw = render_digits(base, value)
+        _set_raw(literal, raw.lower())
+        if literal._raw != raw:
+            value = parse_digits(base, literal._raw)
+    _set_value(literal, value)
+    return literal
+
+
+# Compiled parameter types: the base for bN, ANY_BASE for b_, STR for str, ARRAY for arr and
+# ANY for any. Any other type string is kept as is and rejected when the function is called.
+ANY_BASE = 0
+STR = -1
+ARRAY = -2
+ANY = -3
+PARAM_TYPES = {"str": STR, "b_": ANY_BASE, "arr": ARRAY, "any": ANY}
+
+
+def compile_params(args):
+    params = []
+    for expected_type, _ in args:
+        if expected_type in PARAM_TYPES:
+            params.append(PARAM_TYPES[expected_type])
+        elif expected_type.startswith("b") and expected_type[1:].isdigit():
+            params.append(int(expected_type[1:]))
+        else:
+            params.append(expected_type)
+    return tuple(params)
 
 
 class Function:
-    def __init__(self, name, args, return_type=None, body=None, builtin=False, impl=None):
+    # pure functions have their results memoized by argument values; native built-ins come from
+    # plugins and are called without check_args (see Mbase/plugins.py)
+    __slots__ = ("name", "args", "return_type", "body", "builtin", "impl", "params", "pure", "native")
+
+    def __init__(self, name, args, return_type=None, body=None, builtin=False, impl=None, pure=False,
+                 native=False):
         self.name = name
         self.args = args
         self.return_type = return_type
         self.body = body
         self.builtin = builtin
         self.impl = impl
+        self.params = compile_params(args)
+        self.pure = pure
+        self.native = native
 
     def is_builtin(self):
         return self.builtin
@@ -94,7 +204,8 @@ class Function:
     def signature(self):
         arg_fmt = ", ".join(f"{t} {n}" for t, n in self.args)
         ret = f" {self.return_type}" if self.return_type else ""
-        return f"fn {self.name}({arg_fmt}){ret}"
+        pure = "pure " if self.pure else ""
+        return f"{pure}fn {self.name}({arg_fmt}){ret}"
 
     def __str__(self):
         return f"{self.signature()} {{ builtin }}" if self.builtin else f"{self.signature()} {{ ... }}"
@@ -1,32 +1,55 @@
-from Mbase.error import print_error_with_origin
+from collections import deque
+
+from Mbase.error import PositionedSyntaxError
 from Mbase.types import BaseLiteral, Function
+from Parser.string import split_string_parts
 from Parser.token_type import TokenType
 from Parser.token import Token
+from Parser.tokenizer import tokenize
 from Mbase.ast import (
+    ArrayLiteral,
     Assign,
     BinOp,
     Call,
     Continue,
     Break,
     If,
+    Interpolation,
     Loop,
     Return,
+    Spawn,
+    Use,
     Text,
     Var,
     While,
 )
 
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
+    def __init__(self, tokens, source=None):
+        # Tokens are pulled lazily; only the lookahead window is kept in memory
+        self.tokens = iter(tokens)
+        self.source = source
+        self.buffer = deque()
         self.pos = 0
+        # Labels of the loops around the current position, innermost last; reset in function bodies
+        self.loops = []
+
+    def fill(self, n):
+        while len(self.buffer) < n:
+            tok = next(self.tokens, None)
+            if tok is None:
+                return False
+            self.buffer.append(tok)
+        return True
 
     def current(self) -> Token:
-        if self.pos < len(self.tokens):
-            return self.tokens[self.pos]
+        if self.buffer or self.fill(1):
+            return self.buffer[0]
         return Token(TokenType.EOF, None)
 
     def advance(self):
+        if self.buffer or self.fill(1):
+            self.buffer.popleft()
         self.pos += 1
 
     def match(self, *types):
@@ -44,40 +67,54 @@ class Parser:
         return tok
 
     def parse(self):
-        results = []
+        return list(self.parse_stream())
+
+    def parse_stream(self):
         while self.current().type != TokenType.EOF:
             if self.match(TokenType.NEWLINE) or self.match(TokenType.SEMICOLON):
                 continue
-
-            if self.current().type == TokenType.FUNCTION:
-                stmt = self.parse_function()
-            elif self.current().type == TokenType.IF:
-                stmt = self.parse_if()
-            elif self.current().type in (TokenType.WHILE, TokenType.LOOP):
-                stmt = self.parse_while_loop()
-            elif self.current().type in (TokenType.BREAK, TokenType.CONTINUE):
-                stmt = self.parse_break_continue()
-            elif self.current().type == TokenType.IDENTIFIER and self.peek().type == TokenType.ASSIGN:
-                stmt = self.parse_statement()
-            else:
-                stmt = self.parse_expression()
-                if self.match(TokenType.SEMICOLON, TokenType.NEWLINE):
-                    pass
-                elif self.current().type != TokenType.EOF:
-                    raise SyntaxError(f"Expected end of expression, got {self.current().type}")
-
-            results.append(stmt)
-        return results
+            yield self.parse_top_level()
+
+    def parse_top_level(self):
+        if self.current().type in (TokenType.FUNCTION, TokenType.PURE):
+            stmt = self.parse_function()
+        elif self.current().type == TokenType.IF:
+            stmt = self.parse_if()
+        elif self.current().type in (TokenType.WHILE, TokenType.LOOP):
+            stmt = self.parse_while_loop()
+        elif self.current().type in (TokenType.BREAK, TokenType.CONTINUE):
+            stmt = self.parse_break_continue()
+        elif self.current().type == TokenType.USE:
+            stmt = self.parse_use()
+        elif self.current().type == TokenType.IDENTIFIER and self.peek().type == TokenType.ASSIGN:
+            stmt = self.parse_statement()
+        else:
+            stmt = self.parse_expression()
+            if self.match(TokenType.SEMICOLON, TokenType.NEWLINE):
+                pass
+            elif self.current().type != TokenType.EOF:
+                raise SyntaxError(f"Expected end of expression, got {self.current().type}")
+        return stmt
 
     def peek(self):
-        if self.pos + 1 < len(self.tokens):
-            return self.tokens[self.pos + 1]
+        if len(self.buffer) > 1 or self.fill(2):
+            return self.buffer[1]
         return Token(TokenType.EOF, None)
 
+    def parse_use(self):
+        self.advance()
+        tok = self.match(TokenType.IDENTIFIER)
+        if not tok:
+            raise SyntaxError("Expected a plugin name after 'use'")
+        sep = self.match(TokenType.SEMICOLON, TokenType.NEWLINE)
+        if not sep and self.current().type != TokenType.EOF:
+            raise SyntaxError("Expected end of statement after 'use'")
+        return Use(tok.value)
+
     def parse_statement(self):
         tok = self.match(TokenType.IDENTIFIER)
         if not tok:
-            print_error_with_origin(self.tokens, self.pos, "Expected identifier", label="SyntaxError")
+            raise SyntaxError("Expected identifier")
         var_name = tok.value
 
         self.expect(TokenType.ASSIGN)
@@ -156,7 +193,7 @@ class Parser:
 
         elif tok.type == TokenType.NUMBER:
             self.advance()
-            return BaseLiteral(10, tok.value)
+            return BaseLiteral.parse(10, tok.value)
 
         elif tok.type == TokenType.IF:
             return self.parse_if()
@@ -170,11 +207,17 @@ class Parser:
         elif tok.type == TokenType.BASE_LITERAL:
             self.advance()
             base, value = tok.value
-            return BaseLiteral(base, value)
+            return BaseLiteral.parse(base, value)
 
         elif tok.type == TokenType.IDENTIFIER and self.peek().type == TokenType.LPAREN:
             return self.parse_call()
 
+        elif tok.type == TokenType.SPAWN:
+            self.advance()
+            if self.current().type != TokenType.IDENTIFIER or self.peek().type != TokenType.LPAREN:
+                raise SyntaxError("Expected a function call after 'spawn'")
+            return Spawn(self.parse_call())
+
         elif tok.type == TokenType.IDENTIFIER:
             self.advance()
             return Var(tok.value)
@@ -182,7 +225,7 @@ class Parser:
 
         elif tok.type == TokenType.TEXT:
             self.advance()
-            return Text(tok.value)
+            return self.parse_text(tok)
 
         elif tok.type == TokenType.LPAREN:
             self.advance()
@@ -190,9 +233,50 @@ class Parser:
             self.expect(TokenType.RPAREN)
             return expr
 
+        elif tok.type == TokenType.LBRACKET:
+            return self.parse_array()
+
         display = tok.value if tok.value is not None else tok.type.name
         raise SyntaxError(f"Unexpected token '{display}' in expression")
 
+    def parse_text(self, tok):
+        try:
+            parts = split_string_parts(tok.value)
+        except PositionedSyntaxError as e:
+            raise PositionedSyntaxError(str(e), self.text_pos(tok, e.pos))
+
+        if all(isinstance(part, str) for part in parts):
+            return Text("".join(parts))
+
+        compiled = []
+        for part in parts:
+            if isinstance(part, str):
+                compiled.append(part)
+                continue
+            index, expr_str = part
+            pos = self.text_pos(tok, index)
+            try:
+                tokens = (Token(t.type, t.value, pos + t.pos) for t in tokenize(expr_str))
+                ast = Parser(tokens, self.source).parse()
+                if len(ast) != 1:
+                    raise SyntaxError("Expected one expression inside '{}'")
+            except PositionedSyntaxError as e:
+                raise PositionedSyntaxError(str(e), pos + e.pos)
+            except SyntaxError as e:
+                raise PositionedSyntaxError(str(e), pos)
+            compiled.append(ast[0])
+        return Interpolation(compiled)
+
+    def text_pos(self, tok, index):
+        # Map an index into the unescaped string value back to the source
+        if self.source is None:
+            return tok.pos + 1 + index
+        i = tok.pos + 1
+        while index > 0 and i < len(self.source):
+            i += 2 if self.source[i] == '\\' and i + 1 < len(self.source) else 1
+            index -= 1
+        return i
+
     def parse_call(self):
         name_tok = self.expect(TokenType.IDENTIFIER)
         self.expect(TokenType.LPAREN)
@@ -208,7 +292,22 @@ class Parser:
         self.expect(TokenType.RPAREN)
         return Call(name_tok.value, args, name_tok.pos)
 
+    def parse_array(self):
+        self.expect(TokenType.LBRACKET)
+
+        items = []
+        if self.current().type != TokenType.RBRACKET:
+            while True:
+                items.append(self.parse_expression())
+                if self.match(TokenType.COMMA):
+                    continue
+                break
+
+        self.expect(TokenType.RBRACKET)
+        return ArrayLiteral(items)
+
     def parse_function(self):
+        pure = self.match(TokenType.PURE) is not None
         self.expect(TokenType.FUNCTION)
         name = self.expect(TokenType.IDENTIFIER).value
         self.expect(TokenType.LPAREN)
@@ -228,17 +327,21 @@ class Parser:
 
         self.expect(TokenType.LBRACE)
         body = []
-        while self.current().type != TokenType.RBRACE:
-            if self.match(TokenType.NEWLINE, TokenType.SEMICOLON):
-                continue
-            if self.current().type == TokenType.IDENTIFIER and self.peek().type == TokenType.ASSIGN:
-                body.append(self.parse_statement())
-            else:
-                body.append(self.parse_expression())
+        outer_loops, self.loops = self.loops, []
+        try:
+            while self.current().type != TokenType.RBRACE:
+                if self.match(TokenType.NEWLINE, TokenType.SEMICOLON):
+                    continue
+                if self.current().type == TokenType.IDENTIFIER and self.peek().type == TokenType.ASSIGN:
+                    body.append(self.parse_statement())
+                else:
+                    body.append(self.parse_expression())
+        finally:
+            self.loops = outer_loops
 
         self.expect(TokenType.RBRACE)
 
-        return Function(name=name, args=args, return_type=return_type, body=body)
+        return Function(name=name, args=args, return_type=return_type, body=body, pure=pure)
 
     def parse_if(self):
         self.expect(TokenType.IF)
@@ -266,24 +369,39 @@ class Parser:
             self.expect(TokenType.LPAREN)
             condition = self.parse_expression()
             self.expect(TokenType.RPAREN)
-            body = self.parse_block()
+            body = self.parse_loop_body(label)
             return While(label, condition, body)
 
         elif kind_token.type == TokenType.LOOP:
-            body = self.parse_block()
+            body = self.parse_loop_body(label)
             return Loop(label, body)
         return None
 
+    def parse_loop_body(self, label):
+        self.loops.append(label)
+        try:
+            return self.parse_block()
+        finally:
+            self.loops.pop()
+
     def parse_break_continue(self):
         kind_token = self.current()
         self.advance()
         label = self.parse_optional_label()
         self.match(TokenType.SEMICOLON, TokenType.NEWLINE)
 
+        # depth counts the loops to leave before the target one; None when the target is not
+        # around this statement (no loop, or a caller's), which is left to a runtime signal
+        depth = None
+        for i, loop_label in enumerate(reversed(self.loops)):
+            if label is None or label == loop_label:
+                depth = i
+                break
+
         if kind_token.type == TokenType.BREAK:
-            return Break(label)
+            return Break(label, depth)
         else:
-            return Continue(label)
+            return Continue(label, depth)
 
     def parse_optional_label(self):
         if self.current().type == TokenType.AT:
@@ -1,4 +1,6 @@
 class Token:
+    __slots__ = ("type", "value", "pos")
+
     def __init__(self, type_, value, pos=None):
         self.type = type_
         self.value = value
@@ -12,6 +12,8 @@ class TokenType(Enum):
     RPAREN = auto()       # )
     LBRACE = auto()       # {
     RBRACE = auto()       # }
+    LBRACKET = auto()     # [
+    RBRACKET = auto()     # ]
 
     # Arithmetic Operators
     PLUS = auto()         # +
@@ -51,6 +53,9 @@ class TokenType(Enum):
     # Misc
     RETURN = auto()
     FUNCTION = auto()
+    PURE = auto()
+    SPAWN = auto()
+    USE = auto()
     COMMENT = auto() # wont be used, tokenizer ignores "#"
     NEWLINE = auto()
     EOF = auto()
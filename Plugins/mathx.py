@@ -0,0 +1,27 @@
+import math
+
+from Mbase.digits import DIGIT_VALUES
+from Mbase.plugins import native
+from Mbase.types import BaseLiteral
+
+# Example plugin, loaded with `use mathx`. Results keep the base of the first argument.
+
+
+@native("fn bits(b_ n) b10")
+def bits(n):
+    return BaseLiteral.from_int(10, n.value.bit_length())
+
+
+@native("fn popcount(b_ n) b10")
+def popcount(n):
+    return BaseLiteral.from_int(10, n.value.bit_count())
+
+
+@native("fn digit_sum(b_ n) b_")
+def digit_sum(n):
+    return BaseLiteral.from_int(n.base, sum(DIGIT_VALUES[ch] for ch in n.raw))
+
+
+@native("fn choose(b_ n, b_ k) b_")
+def choose(n, k):
+    return BaseLiteral.from_int(n.base, math.comb(n.value, k.value))
@@ -0,0 +1,75 @@
+# BaseLiteral allocations and time per iteration of a counting loop, on every engine. "small"
+# counts within the shared small values (0..SMALL_MAX), which allocate nothing; "large" runs the
+# same loop past them, where every + and - builds a new object.
+# Run from the repository root: python -m benchmarks.bench_alloc
+import time
+
+from Mbase import config, types
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Mbase.types import SMALL_MAX, BaseLiteral
+from Parser import tokenizer
+from Parser.parse import Parser
+
+ROUNDS = 20
+COUNT = 1000
+ITERATIONS = ROUNDS * COUNT
+
+
+def program(offset):
+    return (
+        f"r = 0\nwhile (r < {ROUNDS}) {{\n    r = r + 1\n    i = {offset}\n"
+        f"    while (i < {offset + COUNT}) {{\n        i = i + 1\n        flag = i - i\n    }}\n}}\n"
+    )
+
+
+PROGRAMS = {"small": program(0), "large": program(SMALL_MAX + 1)}
+
+
+class Allocations:
+    # Counts BaseLiteral objects created while active; they all come from __init__ or _create
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        self.init, self.create = BaseLiteral.__init__, types._create
+
+        def counted_init(literal, *args):
+            self.count += 1
+            self.init(literal, *args)
+
+        def counted_create(*args):
+            self.count += 1
+            return self.create(*args)
+
+        BaseLiteral.__init__ = counted_init
+        types._create = counted_create
+        return self
+
+    def __exit__(self, *exc):
+        BaseLiteral.__init__ = self.init
+        types._create = self.create
+
+
+def main():
+    config.init()
+    names = list(ENGINES)
+    header = "".join(f"{name + ' allocs':>16}{name + ' (us)':>14}" for name in names)
+    print(f"{'program':>8}" + header)
+    for title, source in PROGRAMS.items():
+        row = []
+        for name in names:
+            engine = ENGINES[name]
+            ctx = {"__source__": source, "__filename__": "<bench>", "__functions__": dict(BUILTINS)}
+            statements = Parser(tokenizer.tokenize(source), source).parse()
+            with Allocations() as allocations:
+                start = time.perf_counter()
+                for stmt in statements:
+                    engine(stmt, ctx)
+                elapsed = time.perf_counter() - start
+            row.append(f"{allocations.count / ITERATIONS:>16.2f}{elapsed / ITERATIONS * 1e6:>14.2f}")
+        print(f"{title:>8}" + "".join(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Cost of one iteration of an arithmetic loop (a compare, a subtraction and an addition) on
+# every engine, by base and by how many digits the numbers have. Values are stored as ints,
+# so the time should not grow with the digit count; digits are only produced when printed.
+# Run from the repository root: python -m benchmarks.bench_arith
+import time
+
+from Mbase import config
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Mbase.types import BaseLiteral
+from Parser import tokenizer
+from Parser.parse import Parser
+
+ITERATIONS = 20000
+BASES = (2, 10, 16, 36, 64)
+DIGITS = (4, 64, 1024)
+
+
+def parse(source):
+    return Parser(tokenizer.tokenize(source), source).parse()
+
+
+def program(base, digits):
+    # Counts n down ITERATIONS times from a number with the given digit count
+    start = BaseLiteral.from_int(base, base ** (digits - 1) + ITERATIONS)
+    stop = BaseLiteral.from_int(base, base ** (digits - 1))
+    step = BaseLiteral.from_int(base, 1)
+    return (
+        f"n = {start}\ntotal = {step}\n"
+        f"while (n > {stop}) {{\n    n = n - {step}\n    total = total + {step}\n}}\n"
+    )
+
+
+def main():
+    config.init()
+    names = list(ENGINES)
+    print(f"{'base':>6}{'digits':>8}" + "".join(f"{name + ' (us)':>14}" for name in names))
+    for base in BASES:
+        for digits in DIGITS:
+            source = program(base, digits)
+            row = []
+            for name in names:
+                engine = ENGINES[name]
+                ctx = {"__source__": source, "__filename__": "<bench>", "__functions__": dict(BUILTINS)}
+                statements = parse(source)
+                start = time.perf_counter()
+                for stmt in statements:
+                    engine(stmt, ctx)
+                row.append((time.perf_counter() - start) / ITERATIONS * 1e6)
+            print(f"{base:>6}{digits:>8}" + "".join(f"{us:>14.2f}" for us in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# Bulk arithmetic on every engine: adding a number to each of COUNT values and summing them, once
+# as an array (one element-wise + and one sum()) and once as an interpreted while loop doing one
+# addition per element. The array rows should barely depend on the engine.
+# Run from the repository root: python -m benchmarks.bench_arrays
+import time
+
+from Mbase import array, config
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Parser import tokenizer
+from Parser.parse import Parser
+
+SIZES = (1_000, 10_000, 100_000)
+
+ARRAY = "values = range(b10@{count})\nshifted = values + b10@3\ntotal = sum(shifted)\n"
+LOOP = (
+    "i = b10@0\ntotal = b10@0\n"
+    "while (i < b10@{count}) {{\n    total = total + i + b10@3\n    i = i + b10@1\n}}\n"
+)
+
+
+def run(engine, source):
+    ctx = {"__source__": source, "__filename__": "<bench>", "__functions__": dict(BUILTINS)}
+    statements = Parser(tokenizer.tokenize(source), source).parse()
+    start = time.perf_counter()
+    for stmt in statements:
+        engine(stmt, ctx)
+    elapsed = time.perf_counter() - start
+    return elapsed, ctx["total"]
+
+
+def main():
+    config.init()
+    print("array backend:", "numpy int64" if array.numpy is not None else "tuple of ints (NumPy not installed)")
+    names = list(ENGINES)
+    print(f"{'form':>6}{'count':>9}" + "".join(f"{name + ' (ms)':>14}" for name in names))
+    for count in SIZES:
+        for title, template in (("array", ARRAY), ("loop", LOOP)):
+            source = template.format(count=count)
+            row = []
+            for name in names:
+                elapsed, total = run(ENGINES[name], source)
+                assert total.value == count * (count - 1) // 2 + 3 * count, (title, name)
+                row.append(elapsed * 1e3)
+            print(f"{title:>6}{count:>9}" + "".join(f"{ms:>14.2f}" for ms in row))
+
+
+if __name__ == "__main__":
+    main()
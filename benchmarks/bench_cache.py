@@ -0,0 +1,47 @@
+# Time to obtain the AST of a generated script by parsing vs. loading its .mblc cache entry.
+# Run from the repository root: python -m benchmarks.bench_cache
+import os
+import tempfile
+import time
+
+from Mbase import cache, config
+from Parser import tokenizer
+from Parser.parse import Parser
+
+BLOCK = '''fn step_{i}(b_ n) b_ {{
+    total = n * b16@ff + b2@1010 - b10@(42)
+    if (total >= 100 && n != 0) {{
+        out("value {{total}} of step {i}\\n")
+    }}
+    ret total
+}}
+x_{i} = step_{i}(b8@17)
+'''
+
+
+def main():
+    config.init()
+    print(f"{'bytes':>10} {'parse (s)':>10} {'cached (s)':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for blocks in (100, 1000, 10000):
+            path = os.path.join(tmp, f"gen_{blocks}.mbl")
+            source = "".join(BLOCK.format(i=i) for i in range(blocks))
+
+            start = time.perf_counter()
+            ast = Parser(tokenizer.tokenize(source), source).parse()
+            parsed = time.perf_counter() - start
+
+            writer = cache.CacheWriter(path, source)
+            for stmt in ast:
+                writer.add(stmt)
+            writer.commit()
+
+            start = time.perf_counter()
+            loaded = list(cache.load(path, source))
+            cached = time.perf_counter() - start
+            assert len(loaded) == len(ast)
+            print(f"{len(source):>10} {parsed:>10.3f} {cached:>11.3f} {parsed / cached:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# Cost of a user-function call as the number of global variables grows, for every engine.
+# Run from the repository root: python -m benchmarks.bench_calls
+import time
+
+from Mbase import config
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Parser import tokenizer
+from Parser.parse import Parser
+
+SETUP = '''
+fn twice(b_ n) b_ {
+    m = n + n
+    ret m
+}
+'''
+CALLS = '''
+i = 0
+while (i < 2000) {
+    i = twice(i) / 2 + 1
+}
+'''
+CALL_COUNT = 2000
+
+
+def parse(source):
+    return Parser(tokenizer.tokenize(source), source).parse()
+
+
+def main():
+    config.init()
+    calls = parse(CALLS)
+    names = list(ENGINES)
+    print(f"{'globals':>8}" + "".join(f"{name + ' (us)':>14}" for name in names))
+    for count in (10, 1_000, 10_000, 100_000):
+        setup = parse(SETUP)
+        row = []
+        for name in names:
+            engine = ENGINES[name]
+            ctx = {"__source__": "", "__filename__": "<bench>", "__functions__": BUILTINS}
+            for i in range(count):
+                ctx[f"g{i}"] = i
+            for stmt in setup:
+                engine(stmt, ctx)
+            start = time.perf_counter()
+            for stmt in calls:
+                engine(stmt, ctx)
+            row.append((time.perf_counter() - start) / CALL_COUNT * 1e6)
+        print(f"{count:>8}" + "".join(f"{us:>14.2f}" for us in row))
+
+
+if __name__ == "__main__":
+    main()
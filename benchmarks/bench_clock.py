@@ -0,0 +1,65 @@
+# Wall time of timing-based scripts under the real and the virtual clock, on every engine: a
+# countdown that waits a second per step, like examples/1.mbl, and the same countdown run by
+# TASKS spawned tasks at once. Under the virtual clock both should take milliseconds and still
+# end with now() at the same simulated time as the real run.
+# Run from the repository root: python -m benchmarks.bench_clock
+import io
+import time
+from contextlib import redirect_stdout
+
+from Mbase import clock, config, output, tasks
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Parser import tokenizer
+from Parser.parse import Parser
+
+STEPS = 3
+TASKS = 50
+
+COUNTDOWN = f'''fn countdown(b10 n) {{
+    while (n > 0) {{
+        out("{{n}}\\n")
+        n = n - 1
+        wait(1)
+    }}
+}}
+'''
+PROGRAMS = {
+    "countdown": COUNTDOWN + f"countdown({STEPS})\n",
+    "tasks": COUNTDOWN + f"i = 0\nwhile (i < {TASKS}) {{\n    i = i + 1\n    t = spawn countdown({STEPS})\n}}\njoin(t)\n",
+}
+
+
+def run(engine, source, virtual):
+    tasks.reset()
+    clock.init(virtual)
+    ctx = {"__source__": source, "__filename__": "<bench>", "__functions__": dict(BUILTINS)}
+    statements = Parser(tokenizer.tokenize(source), source).parse()
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()) as captured:
+        for stmt in statements:
+            engine(stmt, ctx)
+        tasks.finish()
+        output.flush()
+    return time.perf_counter() - start, clock.get_clock().millis(), captured.getvalue()
+
+
+def main():
+    config.init()
+    names = list(ENGINES)
+    print(f"{'program':>10}{'clock':>9}" + "".join(f"{name + ' (s)':>14}" for name in names) + f"{'now()':>8}")
+    for title, source in PROGRAMS.items():
+        for virtual in (False, True):
+            row, ends, outputs = [], set(), set()
+            for name in names:
+                elapsed, millis, text = run(ENGINES[name], source, virtual)
+                row.append(elapsed)
+                ends.add(round(millis, -3))
+                outputs.add(text)
+            assert len(outputs) == 1 and len(ends) == 1, (title, virtual, ends)
+            label = "virtual" if virtual else "real"
+            print(f"{title:>10}{label:>9}" + "".join(f"{t:>14.3f}" for t in row) + f"{ends.pop():>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# Scaling of base conversion with the number of digits: reading a number written in a base,
+# rebasing it to base 10 and printing it, and rebasing it back and printing it in its own base.
+# Each row should take a little over 10x the time of the previous one, not 100x.
+# Run from the repository root: python -m benchmarks.bench_convert
+import random
+import time
+
+from Mbase.types import VALID_DIGITS, BaseLiteral
+
+BASES = (2, 7, 10, 16, 36, 64)
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def digits(base, count):
+    rng = random.Random(count * 100 + base)
+    return rng.choice(VALID_DIGITS[1:base]) + "".join(rng.choice(VALID_DIGITS[:base]) for _ in range(count - 1))
+
+
+def main():
+    # Like written literals, digits of bases above 36 are lowercased
+    print(f"{'base':>6}{'digits':>10}{'read (s)':>12}{'to b10 (s)':>12}{'back (s)':>12}")
+    for base in BASES:
+        for count in SIZES:
+            raw = digits(base, count).lower()
+            start = time.perf_counter()
+            literal = BaseLiteral(base, raw)
+            read = time.perf_counter()
+            decimal = literal.rebase(10).raw
+            to_decimal = time.perf_counter()
+            back = BaseLiteral(10, decimal).rebase(base).raw
+            end = time.perf_counter()
+            assert back == raw, (base, count)
+            print(f"{base:>6}{count:>10}{read - start:>12.3f}{to_decimal - read:>12.3f}{end - to_decimal:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
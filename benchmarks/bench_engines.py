@@ -0,0 +1,92 @@
+# Run time of every evaluation engine on loop-heavy programs; all engines must print the same.
+# Run from the repository root: python -m benchmarks.bench_engines
+import io
+import time
+from contextlib import redirect_stdout
+
+from Mbase import config, output
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Parser import tokenizer
+from Parser.parse import Parser
+
+PROGRAMS = {
+    "counting loop": '''
+i = 0
+total = 0
+while (i < 50000) {
+    i = i + 1
+    total = total + i * 2 - 1
+}
+out("{total}\\n")
+''',
+    "nested labels": '''
+n = 0
+hits = 0
+loop@outer {
+    n = n + 1
+    if (n > 400) { break@outer }
+    m = 0
+    loop@inner {
+        m = m + 1
+        if (m > 300) { break@inner }
+        if (m == n) { continue@outer }
+        hits = hits + 1
+    }
+}
+out("{hits}\\n")
+''',
+    "recursive calls": '''
+fn fib(b10 n) b10 {
+    r = n
+    if (n > 1) {
+        r = fib(n - 1) + fib(n - 2)
+    }
+    ret r
+}
+out("{fib(20)}\\n")
+''',
+    "string building": '''
+i = 0
+s = ""
+while (i < 20000) {
+    i = i + 1
+    s = "{i} is {i * 7 - 3}"
+}
+out("{s} {str(i)}\\n")
+''',
+}
+REPEAT = 3
+
+
+def run(ast, engine):
+    ctx = {"__source__": "", "__filename__": "<bench>", "__functions__": BUILTINS}
+    captured = io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(captured):
+        for stmt in ast:
+            engine(stmt, ctx)
+        output.flush()
+    return time.perf_counter() - start, captured.getvalue()
+
+
+def main():
+    config.init()
+    names = list(ENGINES)
+    print(f"{'program':<16}" + "".join(f"{name + ' (s)':>14}" for name in names))
+    for title, source in PROGRAMS.items():
+        ast = Parser(tokenizer.tokenize(source), source).parse()
+        timings, outputs = [], set()
+        for name in names:
+            best = None
+            for _ in range(REPEAT):
+                elapsed, text = run(ast, ENGINES[name])
+                best = elapsed if best is None else min(best, elapsed)
+                outputs.add(text)
+            timings.append(best)
+        assert len(outputs) == 1, f"engines disagree on {title!r}: {outputs}"
+        print(f"{title:<16}" + "".join(f"{t:>14.3f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
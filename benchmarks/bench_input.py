@@ -0,0 +1,93 @@
+# Reading piped input. The first table reads a 10-million-line pipe in a child process: with
+# input() per line (what in() used to do), with the block reader behind in(), and with
+# in_values() taking 100k lines per call. The second sums 100k piped numbers with a script on
+# every engine, one in() per line against a single in_values().
+# Run from the repository root: python -m benchmarks.bench_input
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from Mbase.execute import ENGINES
+
+LINES = 10_000_000
+CHUNK = 100_000
+SCRIPT_LINES = 100_000
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+READERS = {
+    "input()": """
+count = 0
+while True:
+    try:
+        input()
+    except EOFError:
+        break
+    count += 1
+""",
+    "in()": """
+from Mbase.reader import get_reader
+read_line = get_reader().read_line
+count = 0
+while True:
+    try:
+        read_line()
+    except EOFError:
+        break
+    count += 1
+""",
+    "in_values()": f"""
+from Mbase.array import BaseArray
+from Mbase.reader import get_reader
+reader = get_reader()
+count = 0
+while not reader.at_end():
+    count += len(BaseArray.parse(10, reader.read_lines({CHUNK})))
+""",
+}
+
+SCRIPTS = {
+    "in()": "total = 0\nwhile (eof() == 0) {\n    total = total + number(in())\n}\nout(\"{total}\\n\")\n",
+    "in_values()": f"total = sum(in_values(b10@{SCRIPT_LINES}))\nout(\"{{total}}\\n\")\n",
+}
+
+
+def numbers(count):
+    return "".join(f"{i}\n" for i in range(count)).encode()
+
+
+def timed(args, data, env=None):
+    start = time.perf_counter()
+    result = subprocess.run(args, input=data, capture_output=True, cwd=ROOT, env=env, check=True)
+    return time.perf_counter() - start, result.stdout.decode()
+
+
+def main():
+    data = numbers(LINES)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    print(f"{'reader':>12}{'lines':>12}{'time (s)':>10}{'lines/s':>14}")
+    for title, code in READERS.items():
+        elapsed, _ = timed([sys.executable, "-c", code + "print(count)"], data, env)
+        print(f"{title:>12}{LINES:>12}{elapsed:>10.2f}{LINES / elapsed:>14.0f}")
+
+    data = numbers(SCRIPT_LINES)
+    expected = f"{SCRIPT_LINES * (SCRIPT_LINES - 1) // 2}\n"
+    names = list(ENGINES)
+    print()
+    print(f"{'script':>12}" + "".join(f"{name + ' (s)':>14}" for name in names))
+    for title, source in SCRIPTS.items():
+        row = []
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sum.mbl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(source)
+            for name in names:
+                elapsed, printed = timed([sys.executable, "run.py", "--no-cache", "--engine", name, path], data)
+                assert printed == expected, (title, name, printed)
+                row.append(elapsed)
+        print(f"{title:>12}" + "".join(f"{t:>14.2f}" for t in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Cost of break/continue on every engine, for loops that jump on every iteration; the empty
+# loop is the overhead to subtract. The last program breaks from inside a called function,
+# the one case still sent as a Python exception.
+# Run from the repository root: python -m benchmarks.bench_loops
+import io
+import time
+from contextlib import redirect_stdout
+
+from Mbase import config, output
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Parser import tokenizer
+from Parser.parse import Parser
+
+ITERATIONS = 20000
+PROGRAMS = {
+    "empty loop": '''
+i = 0
+while (i < 20000) {
+    i = i + 1
+}
+''',
+    "continue": '''
+i = 0
+while (i < 20000) {
+    i = i + 1
+    if (i > 0) { continue }
+    out("unreachable\\n")
+}
+''',
+    "break inner loop": '''
+i = 0
+while (i < 20000) {
+    i = i + 1
+    loop { break }
+}
+''',
+    "continue@outer": '''
+i = 0
+while@outer (i < 20000) {
+    i = i + 1
+    loop {
+        loop { continue@outer }
+    }
+}
+''',
+    "break from a call": '''
+fn stop() b_ {
+    break
+}
+i = 0
+while (i < 20000) {
+    i = i + 1
+    loop { stop() }
+}
+''',
+}
+
+
+def parse(source):
+    return Parser(tokenizer.tokenize(source), source).parse()
+
+
+def main():
+    config.init()
+    names = list(ENGINES)
+    print(f"{'program':<20}" + "".join(f"{name + ' (us)':>14}" for name in names))
+    for title, source in PROGRAMS.items():
+        row = []
+        for name in names:
+            engine = ENGINES[name]
+            ctx = {"__source__": source, "__filename__": "<bench>", "__functions__": dict(BUILTINS)}
+            program = parse(source)
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()) as captured:
+                for stmt in program:
+                    engine(stmt, ctx)
+                output.flush()
+            row.append((time.perf_counter() - start) / ITERATIONS * 1e6)
+            assert not captured.getvalue(), (title, name, captured.getvalue())
+        print(f"{title:<20}" + "".join(f"{us:>14.2f}" for us in row))
+
+
+if __name__ == "__main__":
+    main()
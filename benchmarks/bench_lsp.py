@@ -0,0 +1,56 @@
+# Language-server latency on a generated 50k-line file: full parse vs. incremental edits.
+# Run from the repository root: python -m benchmarks.bench_lsp
+import random
+import time
+
+from Lsp.document import Document
+from Mbase import config
+
+BLOCK = '''fn step_{i}(b_ n) b_ {{
+    total = n * b16@ff + b2@1010
+    if (total >= 100) {{
+        out("value {{total}}\\n")
+    }}
+    ret total
+}}
+x_{i} = step_{i}(b8@17)
+'''
+LINES = 50_000
+EDITS = 200
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    config.init()
+    random.seed(0)
+    text = "".join(BLOCK.format(i=i) for i in range(LINES // BLOCK.count("\n")))
+    doc = Document("file:///bench.mbl", text)
+    print(f"{len(doc.line_starts)} lines, {len(doc.segments)} top-level statements")
+    print(f"initial parse:            {timed(Document, doc.uri, doc.text) * 1000:9.1f} ms")
+
+    full, incremental, queries = [], [], []
+    for edit in range(EDITS):
+        # Type one character into a random function body, then delete it again
+        line = random.randrange(len(doc.line_starts) - 1)
+        offset = doc.offset_at(line, 4)
+        if edit % 40 == 0:
+            full.append(timed(Document, doc.uri, doc.text[:offset] + "z" + doc.text[offset:]))
+        incremental.append(timed(doc.apply_change, "z", offset, offset))
+        incremental.append(timed(doc.apply_change, "", offset, offset + 1))
+        queries.append(timed(lambda: (doc.diagnostics(), doc.symbols())))
+
+    incremental.sort()
+    print(f"full re-parse per edit:   {sum(full) / len(full) * 1000:9.1f} ms")
+    print(f"incremental edit, mean:   {sum(incremental) / len(incremental) * 1000:9.3f} ms")
+    print(f"incremental edit, p99:    {incremental[int(len(incremental) * 0.99)] * 1000:9.3f} ms")
+    print(f"diagnostics + symbols:    {sum(queries) / len(queries) * 1000:9.3f} ms")
+    assert doc.text == text
+
+
+if __name__ == "__main__":
+    main()
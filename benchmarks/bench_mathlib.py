@@ -0,0 +1,94 @@
+# The math built-ins against the loop a script would otherwise write for them, for every engine.
+# The loops are the usual interpreted versions: Newton's method for sqrt, square-and-multiply for
+# pow, Euclid for gcd, trial division for is_prime and one multiplication per factor for factorial,
+# with mod spelled a - (a / b) * b. Each row checks that both give the same result. Times include
+# compiling the statement, which is most of a built-in call on the python engine.
+# Run from the repository root: python -m benchmarks.bench_mathlib
+import time
+
+from Mbase import config
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Parser import tokenizer
+from Parser.parse import Parser
+
+WORKLOADS = {
+    "sqrt": (
+        "fn f(b10 n) b10 {\n"
+        "    x = n\n    y = (x + 1) / 2\n"
+        "    while (y < x) {\n        x = y\n        y = (x + n / x) / 2\n    }\n"
+        "    ret x\n"
+        "}\n",
+        "sqrt", "b10@" + "7" * 400,
+    ),
+    "pow": (
+        "fn f(b10 b, b10 e, b10 m) b10 {\n"
+        "    r = 1\n    b = b - (b / m) * m\n"
+        "    while (e > 0) {\n"
+        "        h = e / 2\n"
+        "        if (e - h * 2 == 1) {\n            r = r * b\n            r = r - (r / m) * m\n        }\n"
+        "        b = b * b\n        b = b - (b / m) * m\n        e = h\n"
+        "    }\n"
+        "    ret r\n"
+        "}\n",
+        "pow", f"b10@3, b10@{'9' * 300}, b10@{2 ** 1279 - 1}",
+    ),
+    "gcd": (
+        "fn f(b10 a, b10 b) b10 {\n"
+        "    while (b > 0) {\n        t = a - (a / b) * b\n        a = b\n        b = t\n    }\n"
+        "    ret a\n"
+        "}\n",
+        "gcd", f"b10@{3 ** 2000 * 2 ** 100}, b10@{3 ** 1500 * 5 ** 600}",
+    ),
+    "is_prime": (
+        "fn f(b10 n) b10 {\n"
+        "    if (n < 2) {\n        ret 0\n    }\n"
+        "    d = 2\n"
+        "    while (d * d <= n) {\n"
+        "        if (n - (n / d) * d == 0) {\n            ret 0\n        }\n"
+        "        d = d + 1\n"
+        "    }\n"
+        "    ret 1\n"
+        "}\n",
+        "is_prime", "b10@100000007",
+    ),
+    "factorial": (
+        "fn f(b10 n) b10 {\n"
+        "    r = 1\n"
+        "    while (n > 1) {\n        r = r * n\n        n = n - 1\n    }\n"
+        "    ret r\n"
+        "}\n",
+        "factorial", "b10@3000",
+    ),
+}
+
+
+def run(engine, source):
+    ctx = {"__source__": "", "__filename__": "<bench>", "__functions__": dict(BUILTINS)}
+    *setup, call = Parser(tokenizer.tokenize(source), source).parse()
+    for stmt in setup:
+        engine(stmt, ctx)
+    start = time.perf_counter()
+    engine(call, ctx)
+    return time.perf_counter() - start, ctx["r"]
+
+
+def main():
+    config.init()
+    names = list(ENGINES)
+    print(f"{'workload':>20}" + "".join(f"{name + ' (ms)':>14}" for name in names))
+    for workload, (function, builtin, args) in WORKLOADS.items():
+        times = {"loop": [], "built-in": []}
+        for name in names:
+            engine = ENGINES[name]
+            loop, expected = run(engine, f"{function}r = f({args})\n")
+            times["loop"].append(loop)
+            elapsed, result = run(engine, f"r = {builtin}({args})\n")
+            times["built-in"].append(elapsed)
+            assert result.value == expected.value, (workload, name)
+        for kind, row in times.items():
+            print(f"{workload + ' ' + kind:>20}" + "".join(f"{t * 1e3:>14.3f}" for t in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Hits, misses and run time of pure functions as --memo-size changes, for every engine.
+# "fib" is recursive and only stays linear while the cache holds the last few results;
+# "cycle" calls with KEYS distinct arguments in turn, so a smaller cache never hits.
+# Run from the repository root: python -m benchmarks.bench_memo
+import time
+
+from Interpreter.runtime import memo_of
+from Mbase import config
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Parser import tokenizer
+from Parser.parse import Parser
+
+FIB = 20
+KEYS = 64
+ROUNDS = 50
+
+WORKLOADS = {
+    "fib": (
+        "pure fn f(b10 n) b10 {\n"
+        "    if (n < 2) {\n        ret n\n    }\n"
+        "    ret f(n - 1) + f(n - 2)\n"
+        "}\n"
+        f"f(b10@{FIB})\n",
+        (1, 2, 3, 16),
+    ),
+    "cycle": (
+        "pure fn f(b10 n) b10 {\n    ret n * n + n\n}\n"
+        f"r = 0\nwhile (r < {ROUNDS}) {{\n    r = r + 1\n"
+        f"    k = 0\n    while (k < {KEYS}) {{\n        f(k)\n        k = k + 1\n    }}\n}}\n",
+        (KEYS // 2, KEYS - 1, KEYS, KEYS * 2),
+    ),
+}
+
+
+def run(engine, source):
+    ctx = {"__source__": "", "__filename__": "<bench>", "__functions__": dict(BUILTINS)}
+    statements = Parser(tokenizer.tokenize(source), source).parse()
+    start = time.perf_counter()
+    for stmt in statements:
+        engine(stmt, ctx)
+    elapsed = time.perf_counter() - start
+    return elapsed, memo_of(ctx["__functions__"]["f"])
+
+
+def main():
+    cfg = config.init()
+    names = list(ENGINES)
+    print(f"{'workload':>10}{'size':>6}{'hits':>8}{'misses':>8}" + "".join(f"{name + ' (ms)':>14}" for name in names))
+    for workload, (source, sizes) in WORKLOADS.items():
+        for size in sizes:
+            cfg.memo_size = size
+            times = []
+            for name in names:
+                elapsed, memo = run(ENGINES[name], source)
+                times.append(elapsed * 1000)
+            print(
+                f"{workload:>10}{size:>6}{memo.hits:>8}{memo.misses:>8}"
+                + "".join(f"{ms:>14.1f}" for ms in times)
+            )
+
+
+if __name__ == "__main__":
+    main()
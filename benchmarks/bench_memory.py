@@ -0,0 +1,63 @@
+# Bytes per AST node, token and value for the slotted classes, compared against
+# otherwise identical subclasses that carry a per-instance __dict__ (the old layout).
+# Run from the repository root: python -m benchmarks.bench_memory
+import tracemalloc
+
+from Mbase import config
+from Mbase.ast import Assign, BinOp, Call, If, Interpolation, Text, Var, While
+from Mbase.types import BaseLiteral, Function
+from Parser import tokenizer
+from Parser.parse import Parser
+from Parser.token import Token
+from Parser.token_type import TokenType
+
+COUNT = 100_000
+
+SAMPLES = [
+    (Var, ("x",)),
+    (Assign, ("x", None)),
+    (BinOp, (TokenType.PLUS, None, None, 0)),
+    (Call, ("out", [], 0)),
+    (Text, ("text",)),
+    (Interpolation, ([],)),
+    (If, (None, None, [], None)),
+    (While, (None, None, [])),
+    (Token, (TokenType.IDENTIFIER, "x", 0)),
+    (BaseLiteral, (16, "ff")),
+    (Function, ("f", [], None, [])),
+]
+
+
+def bytes_per_instance(cls, args):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [cls(*args) for _ in range(COUNT)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Subtract the list holding the instances
+    return (after - before) / COUNT - 8, instances
+
+
+def with_dict(cls):
+    return type(cls.__name__, (cls,), {})
+
+
+def main():
+    config.init()
+    print(f"{'class':>14} {'__dict__ (B)':>13} {'slots (B)':>10} {'saved':>7}")
+    for cls, args in SAMPLES:
+        old, _ = bytes_per_instance(with_dict(cls), args)
+        new, _ = bytes_per_instance(cls, args)
+        print(f"{cls.__name__:>14} {old:>13.0f} {new:>10.0f} {1 - new / old:>6.0%}")
+
+    source = "".join(f"x_{i} = b16@ff * (x + {i}) - b2@1010\nout(\"{{x_{i}}}\\n\")\n" for i in range(20_000))
+    tokens = list(tokenizer.tokenize(source))
+    tracemalloc.start()
+    ast = Parser(iter(tokens), source).parse()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"\nparsed program: {len(ast)} statements, {size / len(ast):.0f} bytes per statement")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Run time of literal-heavy programs on every engine without (-O0) and with (-O1) the AST
+# optimizer; both levels must print the same.
+# Run from the repository root: python -m benchmarks.bench_optimize
+import io
+import time
+from contextlib import redirect_stdout
+
+from Interpreter.optimize import optimize
+from Mbase import config, output
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Parser import tokenizer
+from Parser.parse import Parser
+
+PROGRAMS = {
+    "literal arithmetic": '''
+i = 0
+total = 0
+while (i < 5000) {
+    i = i + 1
+    total = total + b16@ff * b2@1010 - b8@17 / b10@3
+}
+out("{total}\\n")
+''',
+    "constant branches": '''
+i = 0
+hits = 0
+while (i < 5000) {
+    i = i + 1
+    if (b16@10 > b10@15) {
+        hits = hits + 1
+    } else {
+        hits = hits - 1
+    }
+    while (b10@1 == b10@2) {
+        hits = 0
+    }
+}
+out("{hits}\\n")
+''',
+    "pure built-ins": '''
+i = 0
+s = ""
+while (i < 5000) {
+    i = i + 1
+    s = "{str(sqrt(b16@ffff))} {rebase(b10@255, b10@2)} {len(\\"constant\\")}"
+}
+out("{s}\\n")
+''',
+}
+
+
+def parse(source):
+    return Parser(tokenizer.tokenize(source), source).parse()
+
+
+def run(engine, statements):
+    ctx = {"__source__": "", "__filename__": "<bench>", "__functions__": dict(BUILTINS)}
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()) as captured:
+        for stmt in statements:
+            engine(stmt, ctx)
+        output.flush()
+    return time.perf_counter() - start, captured.getvalue()
+
+
+def main():
+    config.init()
+    names = list(ENGINES)
+    print(f"{'program':<20}" + "".join(f"{name + ' -O0/-O1 (s)':>24}" for name in names))
+    for title, source in PROGRAMS.items():
+        row = []
+        for name in names:
+            plain, plain_output = run(ENGINES[name], parse(source))
+            optimized, optimized_output = run(ENGINES[name], list(optimize(parse(source), whole_program=True)))
+            assert plain_output == optimized_output, (title, name, plain_output, optimized_output)
+            row.append(f"{plain:.3f} / {optimized:.3f}")
+        print(f"{title:<20}" + "".join(f"{cell:>24}" for cell in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# High-volume output: a program printing LINES lines with out(), on every engine, into a file
+# standing in for a pipe. "print" is the old out() that called print() for every fragment; "line"
+# and "block" are the flush policies of the output buffer. The "calls" row times out() alone,
+# without an interpreter around it.
+# Run from the repository root: python -m benchmarks.bench_output
+import os
+import sys
+import tempfile
+import time
+
+from Mbase import config, output
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Parser import tokenizer
+from Parser.parse import Parser
+
+LINES = 100_000
+SOURCE = f'i = 0\nwhile (i < {LINES}) {{\n    i = i + 1\n    out("line {{i}} of {LINES}\\n")\n}}\n'
+MODES = ("print", "line", "block")
+
+
+def print_out(value):
+    print(value, end="")
+
+
+def open_mode(mode):
+    if mode == "print":
+        return print_out
+    output.init(policy=mode)
+    return output.write
+
+
+def run(mode, name, statements, target):
+    sys.stdout = target
+    BUILTINS["out"].impl = open_mode(mode)
+    ctx = {"__source__": SOURCE, "__filename__": "<bench>", "__functions__": dict(BUILTINS)}
+    start = time.perf_counter()
+    if name == "calls":
+        write = BUILTINS["out"].impl
+        for i in range(LINES):
+            write(f"line {i + 1} of {LINES}\n")
+    else:
+        for stmt in statements:
+            ENGINES[name](stmt, ctx)
+    output.flush()
+    sys.stdout.flush()
+    return time.perf_counter() - start
+
+
+def main():
+    config.init()
+    names = ["calls"] + list(ENGINES)
+    statements = Parser(tokenizer.tokenize(SOURCE), SOURCE).parse()
+    impl, stdout = BUILTINS["out"].impl, sys.stdout
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.txt")
+        try:
+            for name in names:
+                for mode in MODES:
+                    with open(path, "w", encoding="utf-8") as target:
+                        results[name, mode] = run(mode, name, statements, target)
+                    with open(path, encoding="utf-8") as written:
+                        assert sum(1 for _ in written) == LINES, (name, mode)
+        finally:
+            BUILTINS["out"].impl, sys.stdout = impl, stdout
+            output.init()
+    print(f"{'engine':>8}" + "".join(f"{mode + ' (ms)':>14}" for mode in MODES))
+    for name in names:
+        print(f"{name:>8}" + "".join(f"{results[name, mode] * 1e3:>14.1f}" for mode in MODES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Cost of calling a plugin function, for every engine. "native" is the function as `use mathx`
+# loads it, called without the per-call argument check; "checked" is the same Python function
+# registered like a built-in of Mbase/builtin.py, so every call goes through check_args first.
+# The loop around the calls is timed separately and subtracted.
+# Run from the repository root: python -m benchmarks.bench_plugins
+import time
+
+from Mbase import config, plugins
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Mbase.types import Function
+from Parser import tokenizer
+from Parser.parse import Parser
+from Plugins import mathx
+
+CALLS = {"bits": "bits(b10@1000)", "choose": "choose(b10@50, b10@25)"}
+ITERATIONS = 10000
+CALLS_PER_ITERATION = 5
+REPEAT = 7
+
+
+def parse(source):
+    return Parser(tokenizer.tokenize(source), source).parse()
+
+
+def program(call, calls):
+    body = f"    {call}\n" * calls
+    return f"i = 0\nwhile (i < {ITERATIONS}) {{\n    i = i + 1\n{body}}}\n"
+
+
+def functions(mode):
+    functions = dict(BUILTINS)
+    for name, fn in plugins.use("mathx", {}).items():
+        if mode == "checked":
+            fn = Function(fn.name, fn.args, fn.return_type, builtin=True, impl=getattr(mathx, name))
+        functions[name] = fn
+    return functions
+
+
+def run(engine, mode, source):
+    ctx = {"__source__": "", "__filename__": "<bench>", "__functions__": functions(mode)}
+    statements = parse(source)
+    start = time.perf_counter()
+    for stmt in statements:
+        engine(stmt, ctx)
+    return time.perf_counter() - start
+
+
+def main():
+    config.init()
+    names = list(ENGINES)
+    print(f"{'call':>16}" + "".join(f"{name + ' (us)':>14}" for name in names))
+    for title, call in CALLS.items():
+        for mode in ("checked", "native"):
+            row = []
+            for name in names:
+                engine = ENGINES[name]
+                calls = min(run(engine, mode, program(call, CALLS_PER_ITERATION)) for _ in range(REPEAT))
+                empty = min(run(engine, mode, program(call, 0)) for _ in range(REPEAT))
+                row.append((calls - empty) / (ITERATIONS * CALLS_PER_ITERATION) * 1e6)
+            print(f"{title + ' ' + mode:>16}" + "".join(f"{us:>14.2f}" for us in row))
+
+
+if __name__ == "__main__":
+    main()
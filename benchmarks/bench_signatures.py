@@ -0,0 +1,59 @@
+# Cost of a user-function call as its number of typed parameters grows, for every engine.
+# The body does no work and the loop around the calls is timed separately and subtracted,
+# so the time is lookup, argument checks and frame setup.
+# Run from the repository root: python -m benchmarks.bench_signatures
+import time
+
+from Mbase import config
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Parser import tokenizer
+from Parser.parse import Parser
+
+TYPES = ("b10", "str", "b_", "b16")
+VALUES = ("b10@1", '"s"', "b2@1", "b16@f")
+ITERATIONS = 1000
+CALLS_PER_ITERATION = 5
+REPEAT = 5
+
+
+def parse(source):
+    return Parser(tokenizer.tokenize(source), source).parse()
+
+
+def program(count, calls):
+    params = ", ".join(f"{TYPES[i % 4]} p{i}" for i in range(count))
+    args = ", ".join(VALUES[i % 4] for i in range(count))
+    body = f"    f({args})\n" * calls
+    return (
+        f"fn f({params}) b_ {{\n    ret b10@0\n}}\n"
+        f"i = 0\nwhile (i < {ITERATIONS}) {{\n    i = i + 1\n{body}}}\n"
+    )
+
+
+def run(engine, source):
+    ctx = {"__source__": "", "__filename__": "<bench>", "__functions__": dict(BUILTINS)}
+    define, *statements = parse(source)
+    engine(define, ctx)
+    start = time.perf_counter()
+    for stmt in statements:
+        engine(stmt, ctx)
+    return time.perf_counter() - start
+
+
+def main():
+    config.init()
+    names = list(ENGINES)
+    print(f"{'params':>8}" + "".join(f"{name + ' (us)':>14}" for name in names))
+    for count in (0, 2, 4, 8, 16):
+        row = []
+        for name in names:
+            engine = ENGINES[name]
+            calls = min(run(engine, program(count, CALLS_PER_ITERATION)) for _ in range(REPEAT))
+            empty = min(run(engine, program(count, 0)) for _ in range(REPEAT))
+            row.append((calls - empty) / (ITERATIONS * CALLS_PER_ITERATION) * 1e6)
+        print(f"{count:>8}" + "".join(f"{us:>14.2f}" for us in row))
+
+
+if __name__ == "__main__":
+    main()
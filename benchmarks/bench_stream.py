@@ -0,0 +1,44 @@
+# Peak memory and time-to-first-statement of whole-program vs. streaming parsing.
+# Run from the repository root: python -m benchmarks.bench_stream
+import time
+import tracemalloc
+
+from Interpreter.evaluate import evaluate
+from Mbase import config
+from Mbase.builtin import BUILTINS
+from Mbase.types import BaseLiteral
+from Parser import tokenizer
+from Parser.parse import Parser
+
+LINE = "x = x + b16@ff * b2@1010 - {i}\n"
+
+
+def run(source, stream):
+    ctx = {"x": BaseLiteral(10, "0"), "__functions__": BUILTINS}
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    parser = Parser(tokenizer.tokenize(source))
+    for stmt in (parser.parse_stream() if stream else parser.parse()):
+        evaluate(stmt, ctx)
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first, total, peak
+
+
+def main():
+    config.init()
+    print(f"{'statements':>10} {'mode':>7} {'first (s)':>10} {'total (s)':>10} {'peak (MB)':>10}")
+    for count in (5_000, 20_000, 50_000):
+        source = "".join(LINE.format(i=i % 100) for i in range(count))
+        for stream in (False, True):
+            first, total, peak = run(source, stream)
+            mode = "stream" if stream else "batch"
+            print(f"{count:>10} {mode:>7} {first:>10.4f} {total:>10.3f} {peak / 2 ** 20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
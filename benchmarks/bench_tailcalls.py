@@ -0,0 +1,52 @@
+# A 1,000,000-deep tail recursion on every engine: peak traced memory stays flat as the depth
+# grows, where a Python-level call per MBase call would hit the recursion limit after ~1000.
+# Run from the repository root: python -m benchmarks.bench_tailcalls
+import time
+import tracemalloc
+
+from Mbase import config
+from Mbase.builtin import BUILTINS
+from Mbase.execute import ENGINES
+from Parser import tokenizer
+from Parser.parse import Parser
+
+SETUP = '''
+fn count(b_ n, b_ acc) b_ {
+    if (n == 0) {
+        ret acc
+    }
+    ret count(n - 1, acc + 1)
+}
+'''
+
+
+def parse(source):
+    return Parser(tokenizer.tokenize(source), source).parse()
+
+
+def main():
+    config.init()
+    names = list(ENGINES)
+    print(f"{'depth':>8}" + "".join(f"{name + ' (s / KiB)':>20}" for name in names))
+    for depth in (1_000, 1_000_000):
+        call = parse(f"result = count({depth}, 0)")
+        row = []
+        for name in names:
+            engine = ENGINES[name]
+            ctx = {"__source__": "", "__filename__": "<bench>", "__functions__": BUILTINS}
+            for stmt in parse(SETUP):
+                engine(stmt, ctx)
+            tracemalloc.start()
+            start = time.perf_counter()
+            for stmt in call:
+                engine(stmt, ctx)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert str(ctx["result"]) == str(depth), (name, ctx["result"])
+            row.append(f"{elapsed:.2f} / {peak // 1024}")
+        print(f"{depth:>8}" + "".join(f"{cell:>20}" for cell in row))
+
+
+if __name__ == "__main__":
+    main()
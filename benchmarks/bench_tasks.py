@@ -0,0 +1,62 @@
+# Many pacing scripts at once: COUNT copies of a loop that prints a line and waits GAP seconds,
+# TICKS times. "tasks" runs them as spawned tasks of one process, "processes" starts one
+# process per script, all at the same time. Both should take about TICKS * GAP seconds of wall
+# time; the CPU time is what running one interpreter per script costs.
+# Run from the repository root: python -m benchmarks.bench_tasks
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from Mbase.execute import ENGINES
+
+COUNT = 200
+TICKS = 3
+GAP = 1
+
+PACE = f'''fn pace(b10 n) {{
+    i = 0
+    while (i < {TICKS}) {{
+        i = i + 1
+        out("script {{n}} tick {{i}}\\n")
+        wait({GAP})
+    }}
+}}
+'''
+TASKS = PACE + f"n = 0\nwhile (n < {COUNT}) {{\n    n = n + 1\n    t = spawn pace(n)\n}}\n"
+SINGLE = PACE + "pace(1)\n"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run(engine, path, copies):
+    command = [sys.executable, "run.py", "--no-cache", "--engine", engine, path]
+    cpu, start = children_cpu(), time.perf_counter()
+    processes = [subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE) for _ in range(copies)]
+    lines = sum(len(process.communicate()[0].splitlines()) for process in processes)
+    return time.perf_counter() - start, children_cpu() - cpu, lines
+
+
+def main():
+    print(f"{COUNT} scripts, {TICKS} ticks {GAP}s apart")
+    print(f"{'engine':>8}{'form':>11}{'wall (s)':>10}{'cpu (s)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tasks, single = os.path.join(tmp, "tasks.mbl"), os.path.join(tmp, "single.mbl")
+        for path, source in ((tasks, TASKS), (single, SINGLE)):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(source)
+        for name in ENGINES:
+            for form, path, copies in (("tasks", tasks, 1), ("processes", single, COUNT)):
+                wall, cpu, lines = run(name, path, copies)
+                assert lines == COUNT * TICKS, (name, form, lines)
+                print(f"{name:>8}{form:>11}{wall:>10.2f}{cpu:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
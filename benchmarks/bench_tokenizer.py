@@ -0,0 +1,36 @@
+# Tokenizer throughput for growing sources; time per KB should stay flat.
+# Run from the repository root: python -m benchmarks.bench_tokenizer
+import time
+
+from Mbase import config
+from Parser.tokenizer import tokenize
+
+CHUNK = '''# generated block
+fn step_{i}(b_ n) b_ {{
+    total = n * b16@ff + b2@1010 - b10@(42)
+    if (total >= 100 && n != 0) {{
+        out("value {{total}} of \\"step\\"\\n")
+    }}
+    ret total
+}}
+x_{i} = step_{i}(b8@17)
+'''
+
+
+def make_source(blocks):
+    return "".join(CHUNK.format(i=i) for i in range(blocks))
+
+
+def main():
+    config.init()
+    print(f"{'bytes':>12} {'tokens':>10} {'seconds':>9} {'us/KB':>8}")
+    for blocks in (250, 1000, 4000, 16000, 64000):
+        source = make_source(blocks)
+        start = time.perf_counter()
+        count = sum(1 for _ in tokenize(source))
+        elapsed = time.perf_counter() - start
+        print(f"{len(source):>12} {count:>10} {elapsed:>9.3f} {elapsed / len(source) * 1024 * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()